@@ -0,0 +1,76 @@
+"""
+Offline benchmark suite.
+
+    python -m vast.bench                   # run and compare against baseline
+    python -m vast.bench --save-baseline   # record a new baseline
+    python -m vast.bench --stages scene_detection export
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from box import Box
+
+from vast.bench.runner import (
+    STAGES, compare_to_baseline, load_report, print_report, run_benchmarks, save_report,
+)
+from vast.utils import load_yaml
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vast.bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=None)
+    parser.add_argument("--repeats", type=int, default=None)
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--baseline", default=None, help="baseline report JSON")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="allowed slowdown vs. baseline, e.g. 0.25")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", default=None, help="also write this run's report here")
+    parser.add_argument("--verbose", action="store_true", help="show stage output")
+    args = parser.parse_args(argv)
+
+    cfg = Box(load_yaml(args.config)).get("bench", Box())
+    work_dir = Path(args.work_dir or cfg.get("work_dir", "data/bench"))
+    baseline_path = Path(args.baseline or cfg.get("baseline", "bench_baseline.json"))
+    repeats = args.repeats or cfg.get("repeats", 3)
+    threshold = args.threshold if args.threshold is not None else cfg.get("regression_threshold", 0.25)
+    min_delta_s = cfg.get("min_delta_s", 0.005)
+    fixture_cfg = cfg.get("fixture", Box()).to_dict()
+
+    report = run_benchmarks(
+        work_dir,
+        repeats=repeats,
+        stages=args.stages,
+        fixture_cfg=fixture_cfg,
+        scene_threshold=cfg.get("scene_threshold", 0.6),
+        quiet=not args.verbose,
+    )
+
+    if args.output:
+        save_report(report, args.output)
+
+    if args.save_baseline:
+        print_report(report)
+        save_report(report, baseline_path)
+        return 0
+
+    comparison = None
+    if baseline_path.exists():
+        comparison = compare_to_baseline(report, load_report(baseline_path),
+                                         threshold, min_delta_s)
+    else:
+        print(f"No baseline at {baseline_path}; run with --save-baseline to record one.")
+
+    print_report(report, comparison)
+
+    wrong = any(m.get("correct") is False for m in report["stages"].values())
+    regressed = any(row["regressed"] for row in comparison or [])
+    return 1 if wrong or regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+accuracy.py
+----------------------------------------
+Compare captions and summaries produced at a reduced inference
+precision (int8 / bf16) against fp32 on the same inputs, together
+with the CPU speedup. Uses the real models, so it needs them to be
+downloadable or cached.
+
+    python -m vast.bench.accuracy --precision int8
+    python -m vast.bench.accuracy --precision bf16 --images data/keyframes --limit 20
+----------------------------------------
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from box import Box
+
+from vast.utils import PRECISIONS, configure_threads, load_yaml
+
+
+def rouge1_f1(reference, candidate):
+    """Unigram overlap F1 between two texts (case-insensitive)."""
+    ref = Counter(reference.lower().split())
+    cand = Counter(candidate.lower().split())
+    overlap = sum((ref & cand).values())
+    if not ref or not cand or not overlap:
+        return float(not ref and not cand)
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    outputs = [fn(item) for item in items]
+    return outputs, time.perf_counter() - start
+
+
+def measure(items, run, load, precision):
+    """
+    Load the model at `precision` and run one warm-up item, both outside
+    the timer, then time inference over all items.
+    Returns (outputs, inference seconds, load seconds).
+    """
+    start = time.perf_counter()
+    load(precision)
+    load_s = time.perf_counter() - start
+    if items:
+        run(items[0], precision)
+    outputs, infer_s = timed(lambda item: run(item, precision), items)
+    return outputs, infer_s, load_s
+
+
+def compare(name, items, run, load, precision):
+    """
+    Run `run(item, precision)` at fp32 and at `precision` and compare
+    outputs. `load(precision)` loads the model; load time (download,
+    quantization) is reported separately from inference time.
+    """
+    reference, ref_s, ref_load_s = measure(items, run, load, "fp32")
+    candidate, cand_s, cand_load_s = measure(items, run, load, precision)
+
+    scores = [rouge1_f1(r, c) for r, c in zip(reference, candidate)]
+    exact = sum(r == c for r, c in zip(reference, candidate))
+    return {
+        "task": name,
+        "precision": precision,
+        "items": len(items),
+        "exact_match": round(exact / len(items), 3) if items else None,
+        "rouge1_f1": round(sum(scores) / len(scores), 3) if scores else None,
+        "fp32_s": round(ref_s, 3),
+        f"{precision}_s": round(cand_s, 3),
+        "speedup": round(ref_s / cand_s, 2) if cand_s else None,
+        "fp32_load_s": round(ref_load_s, 3),
+        f"{precision}_load_s": round(cand_load_s, 3),
+        "examples": [
+            {"fp32": r, precision: c} for r, c in list(zip(reference, candidate))[:3]
+        ],
+    }
+
+
+def check_captions(image_paths, model_name, precision, max_new_tokens=50):
+    from vast.scene_analyzer import generate_scene_description, load_blip_model
+
+    return compare("caption", image_paths,
+                   lambda path, p: generate_scene_description(path, model_name, p, max_new_tokens),
+                   lambda p: load_blip_model(model_name, p), precision)
+
+
+def check_summaries(texts, model_name, precision, max_length=120, min_length=25):
+    from vast.text_summarizer import load_summarizer
+
+    def run(text, p):
+        summarizer = load_summarizer(model_name, p)
+        result = summarizer(text, max_length=max_length, min_length=min_length, do_sample=False)
+        return result[0]["summary_text"]
+
+    return compare("summary", texts, run, lambda p: load_summarizer(model_name, p), precision)
+
+
+def section_texts(subtitles_json, segments_json=None, words_per_section=200):
+    """
+    Texts to summarize: one per scene segment if segments are given
+    (same grouping as summarize_sections), else fixed-size chunks.
+    """
+    from vast.text_summarizer import collect_section_text
+
+    with open(subtitles_json, "r", encoding="utf-8") as f:
+        subtitles = json.load(f)
+
+    if segments_json and Path(segments_json).exists():
+        with open(segments_json, "r", encoding="utf-8") as f:
+            segments = json.load(f)
+        texts = [collect_section_text(subtitles, s["start"], s["end"]) for s in segments]
+        return [t for t in texts if t]
+
+    words = " ".join(s["text"] for s in subtitles).split()
+    return [" ".join(words[i:i + words_per_section])
+            for i in range(0, len(words), words_per_section)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m vast.bench.accuracy", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--precision", choices=[p for p in PRECISIONS if p != "fp32"], default="int8")
+    parser.add_argument("--images", help="keyframe folder (default: paths.keyframes)")
+    parser.add_argument("--subtitles", help="subtitles JSON (default: latest in paths.subtitles)")
+    parser.add_argument("--segments", help="scene_segments.json (default: in paths.sections)")
+    parser.add_argument("--language", help="summarizer language (default: subtitle_generator language)")
+    parser.add_argument("--limit", type=int, default=10, help="max items per task")
+    parser.add_argument("--tasks", nargs="+", choices=["caption", "summary"], default=["caption", "summary"])
+    parser.add_argument("--output", help="write the report JSON here")
+    args = parser.parse_args(argv)
+
+    cfg = Box(load_yaml(args.config))
+    cpu_cfg = cfg.get("cpu_inference", {})
+    configure_threads(cpu_cfg.get("intra_op_threads", 0), cpu_cfg.get("inter_op_threads", 0),
+                      cpu_cfg.get("workers", 1))
+
+    reports = []
+
+    if "caption" in args.tasks:
+        image_dir = Path(args.images or cfg.paths.keyframes)
+        images = sorted(image_dir.glob("*.jpg"))[:args.limit]
+        if not images:
+            print(f"No .jpg files found in {image_dir}, skipping captions.")
+        else:
+            reports.append(check_captions(images, cfg.scene_analyzer.model.name, args.precision,
+                                          cfg.scene_analyzer.get("max_caption_length", 50)))
+
+    if "summary" in args.tasks:
+        from vast.pipeline import resolve_subtitles_json
+        from vast.text_summarizer import pick_summarizer_model
+
+        subtitles_json = resolve_subtitles_json(cfg, args.subtitles)
+        segments_json = args.segments or Path(cfg.paths.sections) / "scene_segments.json"
+        texts = section_texts(subtitles_json, segments_json)[:args.limit]
+        language = args.language or cfg.subtitle_generator.model.language
+        model_name = pick_summarizer_model(cfg.text_analysis.summarizer_model, language)
+        reports.append(check_summaries(texts, model_name, args.precision))
+
+    for report in reports:
+        print(f"\n[{report['task']}] {report['precision']} vs fp32 on {report['items']} items")
+        print(f"  exact match: {report['exact_match']}  rouge-1 F1: {report['rouge1_f1']}")
+        print(f"  fp32 {report['fp32_s']} s  {report['precision']} "
+              f"{report[report['precision'] + '_s']} s  speedup x{report['speedup']} "
+              f"(load: fp32 {report['fp32_load_s']} s, {report['precision']} "
+              f"{report[report['precision'] + '_load_s']} s)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2, ensure_ascii=False)
+        print(f"Accuracy report saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+fixtures.py
+----------------------------------------
+Generate synthetic media fixtures for the offline benchmark suite:
+a video with known cut points (FFmpeg lavfi sources), speech-like
+audio and canned subtitle JSON. No download and no GPU required.
+----------------------------------------
+"""
+
+import json
+import subprocess
+from pathlib import Path
+
+
+# Test patterns alternate with black, so every cut is a clear
+# SSIM drop while frames within a scene stay similar.
+DEFAULT_SOURCES = ["testsrc2", "color=c=black", "smptebars", "color=c=black"]
+
+# Tone with a wobbling pitch, amplitude-modulated at a syllable-like rate.
+SPEECH_LIKE_EXPR = "0.4*sin(2*PI*(180+40*sin(2*PI*0.5*t))*t)*(0.5+0.5*sin(2*PI*4*t))"
+
+CANNED_SENTENCES = [
+    "The speaker introduces the topic of the debate.",
+    "A guest explains the latest figures on alcohol consumption.",
+    "The host asks a follow-up question about prevention.",
+    "Another guest disagrees and points to international studies.",
+    "The discussion turns to the role of advertising.",
+    "The audience reacts to a personal story from the studio.",
+]
+
+
+def _lavfi_source(source, size, fps, duration):
+    sep = ":" if "=" in source else "="
+    return f"{source}{sep}s={size}:r={fps}:d={duration}"
+
+
+def build_video(output_path, scene_durations, sources=None, size="320x240", fps=25):
+    """
+    Concatenate one lavfi source per scene into an H.264/AAC mp4.
+
+    Args:
+        output_path (Path): output .mp4 file
+        scene_durations (list[float]): duration of each scene in seconds
+        sources (list[str]): lavfi video sources, cycled per scene
+        size (str): frame size, e.g. "320x240"
+        fps (int): frame rate; one keyframe is forced per second
+    Returns:
+        list[float]: ground-truth cut points in seconds
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    sources = sources or DEFAULT_SOURCES
+    total = sum(scene_durations)
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error"]
+    for i, duration in enumerate(scene_durations):
+        source = sources[i % len(sources)]
+        cmd += ["-f", "lavfi", "-i", _lavfi_source(source, size, fps, duration)]
+    cmd += ["-f", "lavfi", "-i", f"aevalsrc=exprs={SPEECH_LIKE_EXPR}:s=16000:d={total}"]
+
+    n = len(scene_durations)
+    inputs = "".join(f"[{i}:v]" for i in range(n))
+    cmd += [
+        "-filter_complex", f"{inputs}concat=n={n}:v=1:a=0[v]",
+        "-map", "[v]",
+        "-map", f"{n}:a",
+        "-c:v", "libx264",
+        "-preset", "ultrafast",
+        "-pix_fmt", "yuv420p",
+        "-g", str(fps),          # keyframe every second, so stream copy cuts cleanly
+        "-sc_threshold", "0",
+        "-c:a", "aac",
+        str(output_path),
+    ]
+    subprocess.run(cmd, check=True)
+
+    cuts = []
+    t = 0.0
+    for duration in scene_durations[:-1]:
+        t += duration
+        cuts.append(float(t))
+    return cuts
+
+
+def build_wav(output_path, duration):
+    """Write the speech-like tone as 16 kHz mono WAV (same format as extract_wav_audio)."""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"aevalsrc=exprs={SPEECH_LIKE_EXPR}:s=16000:d={duration}",
+        "-ac", "1",
+        "-ar", "16000",
+        "-c:a", "pcm_s16le",
+        str(output_path),
+    ]
+    subprocess.run(cmd, check=True)
+    return output_path
+
+
+def extract_keyframes(video_path, output_dir, interval, count):
+    """
+    Grab one frame per interval, sampled in the middle of each interval,
+    so keyframe i stands for time i * interval as detect_scenes assumes.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    keyframes = []
+    for i in range(count):
+        t = i * interval + interval / 2
+        frame_path = output_dir / f"frame_{i:04d}.jpg"
+        cmd = [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-ss", f"{t:.3f}",
+            "-i", str(video_path),
+            "-frames:v", "1",
+            "-q:v", "2",
+            str(frame_path),
+        ]
+        subprocess.run(cmd, check=True)
+        keyframes.append(frame_path)
+    return keyframes
+
+
+def write_subtitles(output_path, scene_durations, per_scene=3):
+    """
+    Write canned subtitles in the generate_subtitle JSON format.
+    Every entry lies strictly inside one scene.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    subtitles = []
+    start = 0.0
+    for duration in scene_durations:
+        step = duration / per_scene
+        for k in range(per_scene):
+            seg_start = start + k * step
+            subtitles.append({
+                "id": len(subtitles) + 1,
+                "start": round(seg_start + 0.05, 3),
+                "end": round(seg_start + step - 0.05, 3),
+                "text": CANNED_SENTENCES[len(subtitles) % len(CANNED_SENTENCES)],
+            })
+        start += duration
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(subtitles, f, ensure_ascii=False, indent=2)
+    return output_path
+
+
+def build_fixtures(work_dir, scene_durations=(4, 6, 3, 5), interval=1.0, sources=None):
+    """
+    Build (or reuse) the full fixture set under work_dir.
+
+    Fixtures are deterministic, so they are only rebuilt when the
+    parameters recorded in fixture.json change.
+
+    Returns:
+        dict: paths and ground truth (cut points, scenes)
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = work_dir / "fixture.json"
+
+    params = {
+        "scene_durations": [float(d) for d in scene_durations],
+        "interval": float(interval),
+        "sources": list(sources or DEFAULT_SOURCES),
+    }
+
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("params") == params:
+            print(f"Reusing fixtures in {work_dir}")
+            return manifest
+
+    print(f"Building synthetic fixtures in {work_dir}")
+    durations = params["scene_durations"]
+    total = sum(durations)
+
+    video_path = work_dir / "synthetic.mp4"
+    cuts = build_video(video_path, durations, params["sources"])
+    wav_path = build_wav(work_dir / "synthetic.wav", total)
+
+    count = int(total // interval)
+    keyframe_dir = work_dir / "keyframes"
+    keyframes = extract_keyframes(video_path, keyframe_dir, interval, count)
+
+    subtitles_json = write_subtitles(work_dir / "synthetic_subtitles.json", durations)
+
+    bounds = [0.0] + cuts + [float(total)]
+    manifest = {
+        "params": params,
+        "video": str(video_path),
+        "wav": str(wav_path),
+        "keyframe_dir": str(keyframe_dir),
+        "keyframes": [str(k) for k in keyframes],
+        "subtitles_json": str(subtitles_json),
+        "cuts": cuts,
+        "scenes": [[bounds[i], bounds[i + 1]] for i in range(len(bounds) - 1)],
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    print(f"Fixtures ready: {len(durations)} scenes, {len(keyframes)} keyframes")
+    return manifest
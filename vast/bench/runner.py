@@ -0,0 +1,240 @@
+"""
+runner.py
+----------------------------------------
+Time each pipeline stage on the synthetic fixtures and compare
+latency/throughput against a stored baseline.
+----------------------------------------
+"""
+
+import contextlib
+import io
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+from vast.bench.fixtures import build_fixtures
+from vast.bench.stand_ins import use_stand_ins
+
+
+STAGES = ["scene_detection", "export", "transcription", "captioning", "summarization", "narration"]
+
+
+def time_stage(fn, repeats=3, quiet=True, warmup=True):
+    """
+    Run fn() `repeats` times and return (last result, list of wall times).
+    An untimed warm-up run first keeps one-off costs (lazy imports, file
+    cache) out of the numbers. Stage output printed to stdout is
+    swallowed when quiet is set.
+    """
+    timings = []
+    result = None
+    for i in range(repeats + int(warmup)):
+        sink = io.StringIO() if quiet else None
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+        if i >= int(warmup):
+            timings.append(elapsed)
+    return result, timings
+
+
+def summarize_timings(timings, items):
+    latency = statistics.median(timings)
+    return {
+        "items": items,
+        "repeats": len(timings),
+        "latency_s": round(latency, 6),
+        "min_s": round(min(timings), 6),
+        "max_s": round(max(timings), 6),
+        "throughput": round(items / latency, 3) if latency > 0 else None,
+    }
+
+
+def run_benchmarks(work_dir, repeats=3, stages=None, fixture_cfg=None,
+                   scene_threshold=0.6, quiet=True):
+    """
+    Build fixtures and benchmark the selected stages.
+
+    Args:
+        work_dir (Path): folder for fixtures and stage outputs
+        repeats (int): timed runs per stage (median is reported)
+        stages (list[str]): subset of STAGES, default all
+        fixture_cfg (dict): scene_durations / interval for build_fixtures
+        scene_threshold (float): detect_scenes threshold
+        quiet (bool): swallow stage prints while timing
+    Returns:
+        dict: {"meta": ..., "stages": {name: metrics}}
+    """
+    work_dir = Path(work_dir)
+    stages = stages or STAGES
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark stages: {sorted(unknown)}")
+
+    fixture_cfg = dict(fixture_cfg or {})
+    fx = build_fixtures(work_dir, **fixture_cfg)
+    interval = fx["params"]["interval"]
+    keyframes = [Path(k) for k in fx["keyframes"]]
+    scenes = [tuple(s) for s in fx["scenes"]]
+
+    sections_dir = work_dir / "sections"
+    segments_json = sections_dir / "scene_segments.json"
+    summaries_json = work_dir / "text_analysis" / "text_summaries.json"
+
+    # Prerequisite outputs are produced once, untimed, when only a
+    # downstream stage was selected.
+    need_summaries = "summarization" in stages or (
+        "narration" in stages and not summaries_json.exists())
+    need_segments = "export" in stages or (need_summaries and not segments_json.exists())
+
+    results = {}
+
+    if "scene_detection" in stages:
+        from vast.scene_segmenter import detect_scenes
+
+        detected, timings = time_stage(
+            lambda: detect_scenes(keyframes, interval=interval, method="ssim",
+                                  threshold=scene_threshold),
+            repeats, quiet,
+        )
+        metrics = summarize_timings(timings, len(keyframes))
+        detected_cuts = [float(start) for start, _ in detected[1:]]
+        metrics["cuts_expected"] = fx["cuts"]
+        metrics["cuts_detected"] = detected_cuts
+        metrics["correct"] = detected_cuts == fx["cuts"]
+        results["scene_detection"] = metrics
+
+    # Downstream stages use the ground-truth scenes so that their timings
+    # do not depend on segmentation quality.
+    if need_segments:
+        from vast.scene_segmenter import export_scenes
+
+        _, timings = time_stage(
+            lambda: export_scenes(fx["video"], scenes, sections_dir),
+            repeats if "export" in stages else 1, quiet, warmup="export" in stages,
+        )
+        if "export" in stages:
+            results["export"] = summarize_timings(timings, len(scenes))
+
+    with use_stand_ins():
+        if "transcription" in stages:
+            from vast.subtitle_generator import generate_subtitle_windowed
+
+            # Windowed path on the speech-like WAV: per-window decoding and
+            # segment stitching; items are seconds of audio.
+            audio_s = sum(fx["params"]["scene_durations"])
+            _, timings = time_stage(
+                lambda: generate_subtitle_windowed(Path(fx["wav"]), work_dir / "subtitles",
+                                                   {"whisper_size": "tiny", "language": "en"},
+                                                   window_s=5, overlap_s=1),
+                repeats, quiet,
+            )
+            results["transcription"] = summarize_timings(timings, audio_s)
+
+        if "captioning" in stages:
+            from vast.scene_analyzer import analyze_directory
+
+            out_dir = work_dir / "scene_descriptions"
+            _, timings = time_stage(
+                lambda: analyze_directory(fx["keyframe_dir"], out_dir),
+                repeats, quiet,
+            )
+            results["captioning"] = summarize_timings(timings, len(keyframes))
+
+        if need_summaries:
+            from vast.text_summarizer import summarize_sections
+
+            _, timings = time_stage(
+                lambda: summarize_sections(fx["subtitles_json"], segments_json, summaries_json,
+                                           language="en"),
+                repeats if "summarization" in stages else 1, quiet,
+                warmup="summarization" in stages,
+            )
+            if "summarization" in stages:
+                results["summarization"] = summarize_timings(timings, len(scenes))
+
+        if "narration" in stages:
+            from vast.narration_generator import generate_narration_from_summaries
+
+            _, timings = time_stage(
+                lambda: generate_narration_from_summaries(summaries_json, work_dir / "audio",
+                                                          lang="en"),
+                repeats, quiet,
+            )
+            results["narration"] = summarize_timings(timings, len(scenes))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "fixture": fx["params"],
+            "repeats": repeats,
+        },
+        "stages": results,
+    }
+
+
+def compare_to_baseline(current, baseline, threshold=0.25, min_delta_s=0.005):
+    """
+    Compare stage latencies against a baseline report.
+
+    A stage regresses when its latency exceeds the baseline by more than
+    `threshold` (0.25 = 25 % slower) and by at least `min_delta_s` seconds,
+    which keeps timer noise on millisecond stages from failing the run.
+    A failed correctness check always counts as a regression.
+
+    Returns:
+        list[dict]: one row per stage present in both reports
+    """
+    rows = []
+    for name, metrics in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            continue
+        ratio = metrics["latency_s"] / base["latency_s"] if base["latency_s"] else None
+        regressed = (ratio is not None and ratio > 1 + threshold
+                     and metrics["latency_s"] - base["latency_s"] >= min_delta_s)
+        if metrics.get("correct") is False:
+            regressed = True
+        rows.append({
+            "stage": name,
+            "baseline_s": base["latency_s"],
+            "current_s": metrics["latency_s"],
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            "regressed": regressed,
+        })
+    return rows
+
+
+def print_report(current, comparison=None):
+    print(f"{'stage':<16}{'items':>7}{'latency_s':>12}{'items/s':>10}")
+    for name, m in current["stages"].items():
+        line = f"{name:<16}{m['items']:>7}{m['latency_s']:>12.4f}{m['throughput'] or 0:>10.1f}"
+        if m.get("correct") is False:
+            line += "  WRONG CUTS"
+        print(line)
+
+    if comparison:
+        print()
+        print(f"{'stage':<16}{'baseline_s':>12}{'current_s':>12}{'ratio':>8}")
+        for row in comparison:
+            flag = "  REGRESSION" if row["regressed"] else ""
+            print(f"{row['stage']:<16}{row['baseline_s']:>12.4f}{row['current_s']:>12.4f}"
+                  f"{row['ratio'] or 0:>8.2f}{flag}")
+
+
+def save_report(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Benchmark report saved to {path}")
+
+
+def load_report(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
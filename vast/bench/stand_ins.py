@@ -0,0 +1,118 @@
+"""
+stand_ins.py
+----------------------------------------
+Tiny offline stand-ins for the model-backed stages (Whisper, BLIP,
+sentiment, summarization, gTTS). They keep the stage code paths intact while
+removing model download and inference from the measurement.
+----------------------------------------
+"""
+
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+
+from PIL import ImageStat
+
+
+CAPTION_VOCAB = [
+    "a", "dark", "bright", "colorful", "gray", "screen", "with",
+    "test", "pattern", "bars", "studio", "people", "talking",
+]
+
+
+class _Inputs(dict):
+    def to(self, device):
+        return self
+
+
+class TinyCaptionProcessor:
+    """Mimics BlipProcessor: image -> inputs, token ids -> text."""
+
+    def __call__(self, img, return_tensors="pt"):
+        stat = ImageStat.Stat(img.resize((32, 32)))
+        brightness = sum(stat.mean) / 3
+        spread = max(stat.stddev)
+        return _Inputs(pixel_values=(brightness, spread))
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(CAPTION_VOCAB[i] for i in ids)
+
+
+class TinyCaptionModel:
+    """Mimics BlipForConditionalGeneration.generate with a fixed rule."""
+
+    device = "cpu"
+
+    def generate(self, pixel_values, max_new_tokens=50):
+        brightness, spread = pixel_values
+        if spread > 40:
+            ids = [0, 3, 7, 8]                       # a colorful test pattern
+        elif brightness > 128:
+            ids = [0, 2, 5]                          # a bright screen
+        else:
+            ids = [0, 1, 5]                          # a dark screen
+        return [ids[:max_new_tokens]]
+
+
+class TinyWhisperModel:
+    """
+    Mimics whisper's model.transcribe: one segment per `chunk_s` seconds
+    of audio whose RMS energy is above `threshold`. Audio is decoded the
+    same way as with the real model, so decoding cost stays in the timing.
+    """
+
+    def __init__(self, chunk_s=2.0, threshold=0.01, sr=16000):
+        self.chunk_s = chunk_s
+        self.threshold = threshold
+        self.sr = sr
+
+    def transcribe(self, audio, language=None):
+        import numpy as np
+        from vast.subtitle_generator import load_audio_window
+
+        if isinstance(audio, str):
+            audio = load_audio_window(audio, 0.0, 24 * 3600.0, self.sr)
+        step = int(self.chunk_s * self.sr)
+        segments = []
+        for i in range(0, len(audio), step):
+            chunk = audio[i:i + step]
+            if len(chunk) and float(np.sqrt(np.mean(chunk ** 2))) > self.threshold:
+                segments.append({"start": i / self.sr, "end": (i + len(chunk)) / self.sr,
+                                 "text": f" speech {len(segments) + 1}"})
+        return {"language": language or "en", "segments": segments}
+
+
+def tiny_summarizer(text, max_length=120, min_length=25, do_sample=False):
+    """Extractive stand-in: first sentence, capped at max_length words."""
+    first = text.split(". ")[0]
+    return [{"summary_text": " ".join(first.split()[:max_length])}]
+
+
+def tiny_sentiment(text):
+    return [{"label": "LABEL_1", "score": 1.0}]
+
+
+def tiny_blip(model_name, precision="fp32"):
+    return TinyCaptionProcessor(), TinyCaptionModel()
+
+
+def tiny_tts(text, audio_path, lang="en"):
+    """Stand-in for gTTS: writes the text bytes instead of synthesized speech."""
+    with open(audio_path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+
+@contextmanager
+def use_stand_ins():
+    """Swap the model loaders of the stage modules for the tiny stand-ins."""
+    from vast import narration_generator, scene_analyzer, subtitle_generator, text_summarizer
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(subtitle_generator, "load_whisper_model",
+                                              lambda whisper_size: TinyWhisperModel()))
+        stack.enter_context(mock.patch.object(scene_analyzer, "load_blip_model", tiny_blip))
+        stack.enter_context(mock.patch.object(scene_analyzer, "load_sentiment_model",
+                                              lambda model_name=None, precision="fp32": tiny_sentiment))
+        stack.enter_context(mock.patch.object(text_summarizer, "load_summarizer",
+                                              lambda model_name, precision="fp32": tiny_summarizer))
+        stack.enter_context(mock.patch.object(narration_generator, "synthesize_speech", tiny_tts))
+        yield
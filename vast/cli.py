@@ -0,0 +1,174 @@
+"""
+cli.py
+----------------------------------------
+`vast` command line entry point: one subcommand per pipeline stage,
+configured by config.yaml. Nothing heavy is imported until a
+subcommand runs, so `vast --help` starts instantly.
+----------------------------------------
+"""
+
+import argparse
+import sys
+
+
+def _parse_value(text):
+    """Parse a command line value the way config.yaml would (0.3 -> float, true -> bool)."""
+    import yaml
+
+    return yaml.safe_load(text)
+
+
+def _load_cfg(path, overrides=()):
+    from box import Box
+    from vast.utils import load_yaml, set_config_value
+
+    cfg = Box(load_yaml(path))
+    for override in overrides:
+        key, sep, value = override.partition("=")
+        if not sep:
+            raise SystemExit(f"--set expects KEY=VALUE, got: {override}")
+        set_config_value(cfg, key.strip(), _parse_value(value))
+    return cfg
+
+
+def _use_inference_server(cfg):
+    """Point the stage functions at the inference server if config enables it."""
+    import os
+    from vast import inference_client
+
+    server_cfg = cfg.get("inference_server", {})
+    if server_cfg.get("enabled", False) and not os.environ.get(inference_client.ENV_VAR):
+        host = server_cfg.get("host", "127.0.0.1")
+        port = server_cfg.get("port", 8765)
+        os.environ[inference_client.ENV_VAR] = f"http://{host}:{port}"
+    if server_cfg.get("timeout_s") and not os.environ.get(inference_client.TIMEOUT_ENV_VAR):
+        os.environ[inference_client.TIMEOUT_ENV_VAR] = str(server_cfg.timeout_s)
+
+
+def _configure_threads(cfg):
+    from vast.utils import configure_threads
+
+    cpu_cfg = cfg.get("cpu_inference", {})
+    configure_threads(cpu_cfg.get("intra_op_threads", 0), cpu_cfg.get("inter_op_threads", 0),
+                      cpu_cfg.get("workers", 1))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="vast", description="Video analysis and summarization pipeline.")
+    parser.add_argument("--config", default="config.yaml", help="path to config.yaml")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value, e.g. keyframe_extractor.threshold=0.3")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="run the full pipeline")
+    p.add_argument("--url", help="video URL (default: video_downloader.video_url)")
+
+    p = sub.add_parser("download", help="download a video and extract WAV audio")
+    p.add_argument("--url", help="video URL (default: video_downloader.video_url)")
+    p.add_argument("--force", action="store_true", help="download even if the URL was downloaded before")
+
+    p = sub.add_parser("subtitles", help="transcribe with Whisper (skipped if JSON exists)")
+    p.add_argument("--video")
+    p.add_argument("--force", action="store_true", help="transcribe even if subtitles exist")
+
+    p = sub.add_parser("srt", help="regenerate .srt from an existing subtitles JSON")
+    p.add_argument("--subtitles", help="subtitles JSON (default: latest in paths.subtitles)")
+
+    p = sub.add_parser("keyframes", help="extract one keyframe per keyframe_extractor.interval")
+    p.add_argument("--video")
+    p.add_argument("--force", action="store_true", help="re-extract even if keyframes exist")
+
+    p = sub.add_parser("shots", help="detect camera shots and save one frame per shot")
+    p.add_argument("--video")
+
+    p = sub.add_parser("diarize", help="speaker diarization with pyannote")
+    p.add_argument("--wav")
+
+    p = sub.add_parser("segment", help="detect scenes on keyframes and export clips")
+    p.add_argument("--video")
+    p.add_argument("--export-only", action="store_true",
+                   help="re-export the scenes in scene_segments.json without detection")
+
+    sub.add_parser("analyze", help="describe keyframes with BLIP")
+
+    p = sub.add_parser("summarize", help="summarize the subtitles of each scene")
+    p.add_argument("--subtitles", help="subtitles JSON (default: latest in paths.subtitles)")
+
+    sub.add_parser("narrate", help="text-to-speech for the scene summaries")
+
+    p = sub.add_parser("update", help="re-run only the stages affected by config or input changes")
+    p.add_argument("stages", nargs="*", help="stages to bring up to date (default: all)")
+    p.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="run these stages anyway")
+    p.add_argument("--dry-run", action="store_true", help="only show what would run and why")
+
+    p = sub.add_parser("sweep", help="run `update` for several values of one config key")
+    p.add_argument("key", help="dotted config key, e.g. keyframe_extractor.threshold")
+    p.add_argument("values", nargs="+", type=_parse_value)
+    p.add_argument("--stages", nargs="+", help="stop after these stages (e.g. detect_scenes)")
+
+    sub.add_parser("serve", help="run the local inference server (warm models, micro-batching)")
+
+    sub.add_parser("bench", help="offline benchmark suite (see `vast bench --help`)", add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command == "bench":
+        from vast.bench.__main__ import main as bench_main
+
+        return bench_main(["--config", args.config] + rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    from vast import pipeline
+
+    cfg = _load_cfg(args.config, args.overrides)
+
+    if args.command == "serve":
+        from vast.inference_server import serve
+
+        serve(cfg)
+        return 0
+
+    _use_inference_server(cfg)
+    _configure_threads(cfg)
+
+    if args.command == "run":
+        pipeline.run_pipeline(cfg, args.url)
+    elif args.command == "download":
+        pipeline.download(cfg, args.url, force=args.force)
+    elif args.command == "subtitles":
+        pipeline.subtitles(cfg, args.video, force=args.force)
+    elif args.command == "srt":
+        pipeline.srt(cfg, args.subtitles)
+    elif args.command == "keyframes":
+        pipeline.keyframes(cfg, args.video, force=args.force)
+    elif args.command == "shots":
+        pipeline.shots(cfg, args.video)
+    elif args.command == "diarize":
+        pipeline.diarize(cfg, args.wav)
+    elif args.command == "segment":
+        pipeline.segment(cfg, args.video, export_only=args.export_only)
+    elif args.command == "analyze":
+        pipeline.analyze(cfg)
+    elif args.command == "summarize":
+        pipeline.summarize(cfg, args.subtitles)
+    elif args.command == "narrate":
+        pipeline.narrate(cfg)
+    elif args.command == "update":
+        from vast.incremental import update
+
+        update(cfg, args.stages, force=args.force, dry_run=args.dry_run)
+    elif args.command == "sweep":
+        from vast.incremental import sweep
+
+        sweep(cfg, args.key, args.values, args.stages)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+incremental.py
+----------------------------------------
+Incremental re-analysis. Each stage declares the config keys it reads
+and the stages whose outputs it consumes. After a stage runs, the
+config values, upstream digests and a digest of its own outputs are
+recorded in paths.base_dir/pipeline_state.json; `update` then re-runs
+only the stages where one of those changed. A stage that re-runs but
+produces identical output does not invalidate the stages after it.
+
+Changing keyframe_extractor.threshold re-runs detect_scenes (on the
+stored similarity scores, no frame decoding), export_scenes and
+summarize_sections (which reuses summaries of unchanged sections).
+Subtitles, similarity scores and captions are left untouched.
+
+    vast update                         # bring all stages up to date
+    vast update --dry-run               # show what would run and why
+    vast --set keyframe_extractor.threshold=0.3 update
+    vast sweep keyframe_extractor.threshold 0.3 0.4 0.5 --stages detect_scenes
+----------------------------------------
+"""
+
+import copy
+import hashlib
+import json
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+from vast import pipeline
+from vast.utils import config_value, file_digest, files_fingerprint, set_config_value, setup_logger
+
+logger = setup_logger()
+
+STATE_FILE = "pipeline_state.json"
+
+
+def _keyframes(cfg):
+    return files_fingerprint(pipeline.keyframe_list(cfg))
+
+
+def _download(cfg, values, previous, force):
+    # An earlier download of the same URL is reused (downloads.json).
+    video, wav = pipeline.download(cfg, force=force)
+    return str(video), [video, wav]
+
+
+def _subtitles(cfg, values, previous, force):
+    # Without a previous record, adopt subtitles that already exist on disk.
+    result = pipeline.subtitles(cfg, values["download"], force=force or previous is not None)
+    return str(result["json_path"]), [result["json_path"]]
+
+
+def _keyframes_stage(cfg, values, previous, force):
+    # Without a previous record, adopt keyframes that already exist on disk.
+    pipeline.keyframes(cfg, values["download"], force=force or previous is not None)
+    return _keyframes(cfg), []
+
+
+def _similarity(cfg, values, previous, force):
+    pipeline.similarity(cfg, force=force)
+    return str(pipeline.similarity_path(cfg)), [pipeline.similarity_path(cfg)]
+
+
+def _detect_scenes(cfg, values, previous, force):
+    return [list(scene) for scene in pipeline.scenes(cfg)], []
+
+
+def _export_scenes(cfg, values, previous, force):
+    pipeline.export(cfg, values["detect_scenes"], values["download"])
+    return None, [Path(cfg.paths.sections) / "scene_segments.json"]
+
+
+def _analysis_covers_keyframes(cfg, output):
+    """True if `output` describes exactly the current keyframes and is newer than all of them."""
+    if not output.exists():
+        return False
+    keyframes = pipeline.keyframe_list(cfg)
+    with open(output, "r", encoding="utf-8") as f:
+        images = [entry["image"] for entry in json.load(f)]
+    newest = max(k.stat().st_mtime_ns for k in keyframes)
+    return images == [str(k) for k in keyframes] and output.stat().st_mtime_ns >= newest
+
+
+def _analyze(cfg, values, previous, force):
+    output = Path(cfg.paths.scene_descriptions) / "scene_analysis.json"
+    # Without a previous record, adopt captions of the current keyframes.
+    if previous is None and not force and _analysis_covers_keyframes(cfg, output):
+        logger.info(f"Scene analysis already exists: {output}")
+    else:
+        pipeline.analyze(cfg)
+    return None, [output]
+
+
+def _summarize_sections(cfg, values, previous, force):
+    # Same summarizer settings: only sections whose text changed need the model.
+    reuse = (not force and previous is not None
+             and previous["config"] == stage_config(cfg, STAGES_BY_NAME["summarize_sections"]))
+    pipeline.summarize(cfg, values["subtitles"], reuse=reuse)
+    return None, [Path(cfg.paths.text_analysis) / "text_summaries.json"]
+
+
+def _narrate(cfg, values, previous, force):
+    pipeline.narrate(cfg)
+    return None, [Path(cfg.paths.audio) / "narration_metadata.json"]
+
+
+# In dependency order. "config": keys whose value the stage output depends on,
+# "after": stages whose outputs it reads, "inputs": fingerprint of files
+# that may also be replaced outside the pipeline (keyframes).
+STAGES = [
+    {"name": "download", "config": ["video_downloader.video_url"], "after": [], "run": _download},
+    {"name": "subtitles", "config": ["subtitle_generator.model", "long_video.enabled"],
+     "after": ["download"], "run": _subtitles},
+    {"name": "keyframes", "config": ["keyframe_extractor.interval"], "after": ["download"],
+     "inputs": _keyframes, "run": _keyframes_stage},
+    {"name": "similarity", "config": ["keyframe_extractor.similarity"], "after": ["keyframes"],
+     "inputs": _keyframes, "run": _similarity},
+    {"name": "detect_scenes", "config": ["keyframe_extractor.interval", "keyframe_extractor.threshold"],
+     "after": ["similarity"], "run": _detect_scenes},
+    {"name": "export_scenes", "config": [], "after": ["download", "detect_scenes"], "run": _export_scenes},
+    {"name": "analyze", "config": ["scene_analyzer.model", "scene_analyzer.max_caption_length",
+                                   "text_analysis.sentiment_model",
+                                   "text_analysis.sentiment_precision"],
+     "after": ["keyframes"], "inputs": _keyframes, "run": _analyze},
+    {"name": "summarize_sections", "config": ["text_analysis.summarizer_model",
+                                              "text_analysis.summarizer_precision",
+                                              "subtitle_generator.model.language", "long_video.enabled"],
+     "after": ["subtitles", "export_scenes"], "run": _summarize_sections},
+    {"name": "narrate", "config": ["subtitle_generator.model.language"], "after": ["summarize_sections"],
+     "run": _narrate},
+]
+STAGES_BY_NAME = {stage["name"]: stage for stage in STAGES}
+
+
+def stage_config(cfg, stage):
+    return {key: config_value(cfg, key) for key in stage["config"]}
+
+
+def digest(value, outputs):
+    """Digest of a stage result: its JSON value plus the contents of its output files."""
+    h = hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+    for path in outputs:
+        h.update(file_digest(path).encode("utf-8"))
+    return h.hexdigest()
+
+
+def state_path(cfg):
+    return Path(cfg.paths.base_dir) / STATE_FILE
+
+
+def load_state(cfg):
+    path = state_path(cfg)
+    if not path.exists():
+        return {"stages": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(cfg, state):
+    path = state_path(cfg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    tmp.replace(path)
+
+
+def select(targets=None):
+    """Stages needed for `targets` (they and everything upstream), in run order."""
+    if not targets:
+        return list(STAGES)
+    unknown = set(targets) - set(STAGES_BY_NAME)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))} "
+                         f"(choose from {', '.join(STAGES_BY_NAME)})")
+    needed = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(STAGES_BY_NAME[name]["after"])
+    return [stage for stage in STAGES if stage["name"] in needed]
+
+
+def dependents(key):
+    """Stages affected by a config key: those reading it and everything downstream."""
+    affected = set()
+    for stage in STAGES:
+        reads_key = any(key == k or key.startswith(k + ".") or k.startswith(key + ".")
+                        for k in stage["config"])
+        if reads_key or affected.intersection(stage["after"]):
+            affected.add(stage["name"])
+    return [stage["name"] for stage in STAGES if stage["name"] in affected]
+
+
+def stale_reasons(record, config, upstream, inputs):
+    """Why a stage has to run again (empty list = up to date)."""
+    if record is None:
+        return ["never run"]
+    reasons = [f"config changed: {key}" for key in config
+               if record["config"].get(key) != config[key]]
+    reasons += [f"upstream changed: {name}" for name, d in upstream.items()
+                if d is None or record["upstream"].get(name) != d]
+    if inputs != record.get("inputs"):
+        reasons.append("inputs changed")
+    reasons += [f"output missing: {path}" for path in record["outputs"] if not Path(path).exists()]
+    return reasons
+
+
+def update(cfg, targets=None, force=(), dry_run=False):
+    """
+    Bring the selected stages up to date, running only those whose
+    config keys, upstream outputs or inputs changed since the last run.
+
+    Args:
+        cfg (Box): loaded config.yaml
+        targets (list[str]): stages to update (with their upstream); default all
+        force (list[str]): stages to run even if up to date
+        dry_run (bool): only report what would run and why
+
+    Returns:
+        list[dict]: one entry per stage {"stage", "ran", "reasons", "seconds"}
+    """
+    state = load_state(cfg)
+    records = state.setdefault("stages", {})
+    values, digests, report = {}, {}, []
+
+    for stage in select(targets):
+        name = stage["name"]
+        record = records.get(name)
+        config = stage_config(cfg, stage)
+        upstream = {dep: digests.get(dep) for dep in stage["after"]}
+        try:
+            inputs = stage["inputs"](cfg) if "inputs" in stage else None
+        except FileNotFoundError as e:
+            inputs, missing = None, str(e)
+        else:
+            missing = None
+
+        reasons = stale_reasons(record, config, upstream, inputs)
+        if name in force:
+            reasons.insert(0, "forced")
+        if missing and record is not None:
+            reasons.append(missing)
+
+        if not reasons:
+            logger.info(f"[{name}] up to date")
+            values[name] = record["value"]
+            digests[name] = record["digest"]
+            report.append({"stage": name, "ran": False, "reasons": [], "seconds": 0.0})
+            continue
+
+        logger.info(f"[{name}] {'would run' if dry_run else 'running'}: {'; '.join(reasons)}")
+        if dry_run:
+            values[name], digests[name] = None, None
+            report.append({"stage": name, "ran": False, "reasons": reasons, "seconds": 0.0})
+            continue
+
+        start = time.perf_counter()
+        value, outputs = stage["run"](cfg, values, record, name in force)
+        seconds = time.perf_counter() - start
+
+        values[name] = value
+        digests[name] = digest(value, outputs)
+        if record is not None and record["digest"] == digests[name]:
+            logger.info(f"[{name}] output unchanged, later stages stay valid")
+
+        records[name] = {
+            "config": config,
+            "upstream": upstream,
+            "inputs": stage["inputs"](cfg) if "inputs" in stage else None,
+            "outputs": [str(path) for path in outputs],
+            "value": value,
+            "digest": digests[name],
+            "seconds": round(seconds, 3),
+            "updated": datetime.now().isoformat(timespec="seconds"),
+        }
+        save_state(cfg, state)
+        report.append({"stage": name, "ran": True, "reasons": reasons, "seconds": round(seconds, 3)})
+
+    ran = [r["stage"] for r in report if r["ran"]]
+    logger.info(f"Update finished, ran: {', '.join(ran) or 'nothing'}")
+    return report
+
+
+def sweep(cfg, key, values, targets=None):
+    """
+    Run `update` once per value of a config key. Stages that do not depend
+    on the key are computed at most once; the JSON outputs of the affected
+    stages are copied to paths.base_dir/sweeps/<key>=<value>/ and a
+    summary (timings, detected scenes) is written to sweeps/<key>.json.
+    """
+    sweep_dir = Path(cfg.paths.base_dir) / "sweeps"
+    affected = dependents(key)
+    results = []
+
+    for value in values:
+        run_cfg = copy.deepcopy(cfg)
+        set_config_value(run_cfg, key, value)
+
+        start = time.perf_counter()
+        report = update(run_cfg, targets)
+        seconds = time.perf_counter() - start
+
+        out_dir = sweep_dir / f"{key}={value}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        records = load_state(run_cfg)["stages"]
+        for name in affected:
+            for path in records.get(name, {}).get("outputs", []):
+                if path.endswith(".json") and Path(path).exists():
+                    shutil.copy2(path, out_dir / Path(path).name)
+
+        result = {"value": value, "seconds": round(seconds, 3),
+                  "ran": [r["stage"] for r in report if r["ran"]]}
+        if "detect_scenes" in records:
+            result["scenes"] = len(records["detect_scenes"]["value"])
+        results.append(result)
+        logger.info(f"{key}={value}: {seconds:.2f} s, ran {', '.join(result['ran']) or 'nothing'}")
+
+    summary_path = sweep_dir / f"{key}.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    logger.info(f"Sweep summary saved to {summary_path}")
+    return results
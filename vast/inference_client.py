@@ -0,0 +1,115 @@
+"""
+inference_client.py
+----------------------------------------
+Client for the local inference server (vast/inference_server.py).
+Stage functions use it transparently when VAST_INFERENCE_URL is set,
+and fall back to loading models in-process if the server is down or
+does not answer within VAST_INFERENCE_TIMEOUT seconds.
+----------------------------------------
+"""
+
+import http.client
+import json
+import os
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+ENV_VAR = "VAST_INFERENCE_URL"
+TIMEOUT_ENV_VAR = "VAST_INFERENCE_TIMEOUT"
+DEFAULT_TIMEOUT_S = 600  # a long Whisper window can take minutes on CPU
+
+_unreachable = set()
+
+
+class ServerUnavailable(ConnectionError):
+    pass
+
+
+def server_url():
+    """URL of the inference server, or None when client mode is off."""
+    url = os.environ.get(ENV_VAR, "").strip().rstrip("/")
+    if not url or url in _unreachable:
+        return None
+    return url
+
+
+def enabled():
+    return server_url() is not None
+
+
+def timeout_s():
+    try:
+        return float(os.environ.get(TIMEOUT_ENV_VAR) or DEFAULT_TIMEOUT_S)
+    except ValueError:
+        return DEFAULT_TIMEOUT_S
+
+
+def _error_detail(error):
+    """The server's {"error": ...} message, or the HTTP reason for non-JSON bodies."""
+    try:
+        return json.loads(error.read().decode("utf-8")).get("error", error.reason)
+    except (ValueError, AttributeError):
+        return error.reason
+
+
+def _post(endpoint, payload):
+    url = server_url()
+    if url is None:
+        raise ServerUnavailable("Inference server is not configured")
+
+    request = urllib.request.Request(
+        f"{url}/{endpoint}",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout_s()) as response:
+            body = json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"Inference server error on /{endpoint}: {_error_detail(e)}") from e
+    except (urllib.error.URLError, ConnectionError, TimeoutError, http.client.HTTPException) as e:
+        _unreachable.add(url)
+        print(f"Inference server unreachable at {url} ({getattr(e, 'reason', e)}), using local models.")
+        raise ServerUnavailable(url) from e
+
+    return body["result"]
+
+
+def caption(image_paths, model_name, precision="fp32", max_new_tokens=50):
+    """Captions for a list of images (paths are resolved for the server)."""
+    paths = [str(Path(p).resolve()) for p in image_paths]
+    return _post("caption", {"image_paths": paths, "model_name": model_name, "precision": precision,
+                             "max_new_tokens": max_new_tokens})
+
+
+def sentiment(texts, model_name, precision="fp32"):
+    return _post("sentiment", {"texts": list(texts), "model_name": model_name, "precision": precision})
+
+
+def summarize(texts, model_name, max_length=120, min_length=25, precision="fp32"):
+    return _post("summarize", {
+        "texts": list(texts),
+        "model_name": model_name,
+        "max_length": max_length,
+        "min_length": min_length,
+        "precision": precision,
+    })
+
+
+def transcribe(media_path, whisper_size="base", language=None, start=None, duration=None):
+    """Whisper result with "segments" (start, end, text) and "language"."""
+    return _post("transcribe", {
+        "path": str(Path(media_path).resolve()),
+        "whisper_size": whisper_size,
+        "language": language,
+        "start": start,
+        "duration": duration,
+    })
+
+
+def diarize(wav_path, uri):
+    """RTTM text for the WAV file, written with the given URI."""
+    return _post("diarize", {"wav_path": str(Path(wav_path).resolve()), "uri": uri})
@@ -0,0 +1,223 @@
+"""
+inference_server.py
+----------------------------------------
+Local inference daemon. Keeps BLIP, sentiment, summarization, Whisper
+and pyannote models warm in one process and serves them over
+localhost HTTP, so concurrent pipeline runs share one set of weights.
+
+Concurrent requests for the same model are micro-batched: the first
+request waits up to `max_wait_ms` for others to join, then the batch
+goes through the model in a single call.
+
+Endpoints (POST, JSON body, response {"result": ...}):
+    /caption     {"image_paths": [...], "model_name", "precision", "max_new_tokens"}
+    /sentiment   {"texts": [...], "model_name", "precision"}
+    /summarize   {"texts": [...], "model_name", "max_length", "min_length", "precision"}
+    /transcribe  {"path", "whisper_size", "language", "start", "duration"}
+    /diarize     {"wav_path", "uri"}
+GET /health lists the batchers (= warm models) currently in use.
+----------------------------------------
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from vast.utils import configure_threads, get_hf_token, setup_logger
+
+logger = setup_logger()
+
+
+class MicroBatcher:
+    """Collect single items from many threads and run them through fn as batches."""
+
+    def __init__(self, name, fn, max_batch_size=8, max_wait_ms=10):
+        self.name = name
+        self.fn = fn  # list[item] -> list[result]
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._loop, name=f"batcher-{name}", daemon=True)
+        self.thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self.queue.put((item, future))
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = list(self.fn(items))
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: got {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class InferenceService:
+    """Routes requests to one batcher per (endpoint, model settings)."""
+
+    def __init__(self, max_batch_size=8, max_wait_ms=10, hf_token=None):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.hf_token = hf_token
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def _batcher(self, key, fn, batchable=True):
+        with self._lock:
+            if key not in self._batchers:
+                size = self.max_batch_size if batchable else 1
+                self._batchers[key] = MicroBatcher("/".join(map(str, key)), fn, size, self.max_wait_ms)
+            return self._batchers[key]
+
+    def _run(self, batcher, items):
+        futures = [batcher.submit(item) for item in items]
+        return [f.result() for f in futures]
+
+    def caption(self, image_paths, model_name, precision="fp32", max_new_tokens=50):
+        from vast.scene_analyzer import generate_scene_descriptions
+
+        batcher = self._batcher(("caption", model_name, precision, max_new_tokens),
+                                lambda paths: generate_scene_descriptions(paths, model_name, precision,
+                                                                          max_new_tokens))
+        return self._run(batcher, image_paths)
+
+    def sentiment(self, texts, model_name, precision="fp32"):
+        from vast.scene_analyzer import analyze_sentiments
+
+        batcher = self._batcher(("sentiment", model_name, precision),
+                                lambda batch: analyze_sentiments(batch, model_name, precision))
+        return self._run(batcher, texts)
+
+    def summarize(self, texts, model_name, max_length=120, min_length=25, precision="fp32"):
+        from vast.text_summarizer import summarize_texts
+
+        batcher = self._batcher(("summarize", model_name, max_length, min_length, precision),
+                                lambda batch: summarize_texts(batch, model_name, max_length,
+                                                              min_length, precision))
+        return self._run(batcher, texts)
+
+    def transcribe(self, path, whisper_size="base", language=None, start=None, duration=None):
+        from vast.subtitle_generator import transcribe
+
+        # Whisper decodes one file at a time and installs kv-cache hooks on the
+        # shared model, so there is one serializing batcher per model (size);
+        # language travels with each item.
+        batcher = self._batcher(("transcribe", whisper_size),
+                                lambda items: [transcribe(p, whisper_size, lang, s, d)
+                                               for p, lang, s, d in items],
+                                batchable=False)
+        return self._run(batcher, [(path, language, start, duration)])[0]
+
+    def diarize(self, wav_path, uri):
+        from vast.keyframe_extractor.speaker_diarization import diarize_to_rttm
+
+        batcher = self._batcher(("diarize",),
+                                lambda items: [diarize_to_rttm(p, u, self.hf_token) for p, u in items],
+                                batchable=False)
+        return self._run(batcher, [(wav_path, uri)])[0]
+
+    def health(self):
+        return {"status": "ok", "batchers": sorted(b.name for b in self._batchers.values())}
+
+
+ENDPOINTS = {"caption", "sentiment", "summarize", "transcribe", "diarize"}
+
+
+def make_handler(service):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _send(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/health":
+                self._send(200, service.health())
+            else:
+                self._send(404, {"error": f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            endpoint = self.path.strip("/")
+            if endpoint not in ENDPOINTS:
+                self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                result = getattr(service, endpoint)(**payload)
+            except Exception as e:
+                logger.exception(f"/{endpoint} failed")
+                self._send(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            self._send(200, {"result": result})
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return Handler
+
+
+def preload(service, cfg):
+    """Warm the caption, sentiment and summarization models named in config."""
+    from vast.scene_analyzer import load_blip_model, load_sentiment_model
+    from vast.text_summarizer import load_summarizer
+
+    text_cfg = cfg.text_analysis
+    load_blip_model(cfg.scene_analyzer.model.name, cfg.scene_analyzer.model.get("precision", "fp32"))
+    load_sentiment_model(text_cfg.sentiment_model, text_cfg.get("sentiment_precision", "fp32"))
+    load_summarizer(text_cfg.summarizer_model, text_cfg.get("summarizer_precision", "fp32"))
+
+
+def serve(cfg):
+    """Start the inference server described by cfg.inference_server (blocks)."""
+    server_cfg = cfg.get("inference_server", {})
+    host = server_cfg.get("host", "127.0.0.1")
+    port = server_cfg.get("port", 8765)
+
+    cpu_cfg = cfg.get("cpu_inference", {})
+    configure_threads(cpu_cfg.get("intra_op_threads", 0), cpu_cfg.get("inter_op_threads", 0))
+
+    service = InferenceService(
+        max_batch_size=server_cfg.get("max_batch_size", 8),
+        max_wait_ms=server_cfg.get("max_wait_ms", 10),
+        hf_token=get_hf_token(cfg),
+    )
+    if server_cfg.get("preload", False):
+        preload(service, cfg)
+
+    httpd = ThreadingHTTPServer((host, port), make_handler(service))
+    httpd.daemon_threads = True
+    logger.info(f"Inference server listening on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Inference server stopped.")
+    finally:
+        httpd.server_close()
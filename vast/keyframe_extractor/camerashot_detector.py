@@ -1,11 +1,11 @@
 import os
-import cv2
 from pathlib import Path
-from scenedetect import VideoManager, SceneManager
-from scenedetect.detectors import ContentDetector
 
 
 def extract_visual_keyframes(video_path, output_dir):
+    import cv2
+    from scenedetect import VideoManager, SceneManager
+    from scenedetect.detectors import ContentDetector
 
     print("Running camera shot detection (PySceneDetect, CPU)...")
 
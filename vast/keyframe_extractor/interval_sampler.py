@@ -0,0 +1,56 @@
+import json
+import subprocess
+from pathlib import Path
+
+
+MANIFEST = "keyframes.json"
+
+
+def keyframes_source(video_path, interval):
+    """What a set of keyframes was extracted from: video path, size, mtime and interval."""
+    video_path = Path(video_path).resolve()
+    st = video_path.stat()
+    return {"video": str(video_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "interval": float(interval)}
+
+
+def read_manifest(output_dir):
+    path = Path(output_dir) / MANIFEST
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def extract_interval_keyframes(video_path, output_dir, interval=60):
+    """
+    Save one frame every `interval` seconds as frame_0000.jpg, frame_0001.jpg, ...
+    so keyframe i stands for time i * interval, as scene detection assumes.
+    Frames from a previous extraction are removed first, and keyframes.json
+    records the video and interval they came from.
+    """
+    video_path = Path(video_path)
+    if not video_path.exists():
+        raise FileNotFoundError(f"Video not found: {video_path.resolve()}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old_frame in output_dir.glob("frame_*.jpg"):
+        old_frame.unlink()
+
+    print(f"Extracting one keyframe every {interval} s with FFmpeg...")
+    cmd = [
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-i", str(video_path),
+        "-vf", f"fps=1/{interval}",
+        "-q:v", "2",
+        "-start_number", "0",
+        str(output_dir / "frame_%04d.jpg"),
+    ]
+    subprocess.run(cmd, check=True)
+
+    keyframes = sorted(output_dir.glob("frame_*.jpg"))
+    with open(output_dir / MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(keyframes_source(video_path, interval), f, indent=2, ensure_ascii=False)
+    print(f"Saved {len(keyframes)} keyframes to {output_dir}")
+    return keyframes
@@ -0,0 +1,292 @@
+import io
+import json
+import re
+import wave
+from pathlib import Path
+
+from vast import inference_client
+from vast.utils import append_jsonl, get_device, get_hf_token, jsonl_to_json
+
+
+_pipeline = None
+
+
+def parse_rttm(rttm_path):
+
+    # Parse RTTM file into JSON-friendly speaker segments.
+    segments = []
+
+    with open(rttm_path, "r") as f:
+        for i, line in enumerate(f):
+            parts = line.strip().split()
+            # RTTM format:
+            # SPEAKER <file> 1 <start> <duration> <NA> <NA> <speaker> <NA>
+            start = float(parts[3])
+            duration = float(parts[4])
+            speaker = parts[7]
+
+            segments.append({
+                "index": i,
+                "speaker": speaker,
+                "start": start,
+                "end": start + duration,
+            })
+
+    return segments
+
+
+def load_diarization_pipeline(hf_token=None):
+    """Load the pyannote diarization pipeline (only once)."""
+    global _pipeline
+    if _pipeline is None:
+        from pyannote.audio import Pipeline
+
+        device = get_device()
+        print("Device:", device)
+
+        _pipeline = Pipeline.from_pretrained(
+            "pyannote/speaker-diarization-3.1",
+            token=hf_token or get_hf_token(),
+        ).to(device)
+    return _pipeline
+
+
+def diarize_to_rttm(wav_path, uri, hf_token=None):
+    """Run diarization and return the result as RTTM text."""
+    pipeline = load_diarization_pipeline(hf_token)
+    diarization = pipeline(str(wav_path))
+
+    # 取出 Annotation（pyannote.audio >= 3.3）
+    annotation = diarization.speaker_diarization
+    annotation.uri = uri
+
+    buffer = io.StringIO()
+    annotation.write_rttm(buffer)
+    return buffer.getvalue()
+
+
+def extract_speaker_diarization(wav_path, output_dir, hf_token=None):
+    """
+    Diarize a WAV file and write <uri>.rttm and speaker_diarization.json
+    to output_dir. Uses the inference server if configured.
+
+    Returns:
+        Path: speaker_diarization.json
+    """
+    wav_path = Path(wav_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if not wav_path.exists():
+        raise FileNotFoundError(f"WAV not found: {wav_path}")
+
+    print("Running speaker diarization (pyannote.audio 3.4 / 4.x)")
+    print("Audio:", wav_path)
+
+    # RTTM URI 清洗（正则）
+    # 只保留：字母、数字、下划线、连字符
+    # 其他全部替换为 "_"
+    safe_uri = re.sub(r"[^\w\-]", "_", wav_path.stem)
+
+    rttm_text = None
+    if inference_client.enabled():
+        try:
+            rttm_text = inference_client.diarize(wav_path, safe_uri)
+        except inference_client.ServerUnavailable:
+            pass
+    if rttm_text is None:
+        rttm_text = diarize_to_rttm(wav_path, safe_uri, hf_token)
+
+    # 导出 RTTM
+    rttm_path = output_dir / f"{safe_uri}.rttm"
+    print("Exporting RTTM to:", rttm_path)
+
+    with open(rttm_path, "w") as f:
+        f.write(rttm_text)
+
+    print(f"RTTM saved to {rttm_path}")
+
+    # RTTM -> JSON
+    segments = parse_rttm(rttm_path)
+
+    json_path = output_dir / "speaker_diarization.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(segments, f, indent=4, ensure_ascii=False)
+
+    print(f"Speaker diarization JSON saved to {json_path}")
+    print(f"Detected {len(segments)} segments")
+
+    return json_path
+
+
+def wav_duration(wav_path):
+    with wave.open(str(wav_path), "rb") as w:
+        return w.getnframes() / w.getframerate()
+
+
+def read_wav_window(wav_path, start, duration):
+    """Read [start, start + duration) of a 16-bit PCM WAV as a (1, n) float32 tensor."""
+    import numpy as np
+    import torch
+
+    with wave.open(str(wav_path), "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"Expected 16-bit PCM WAV: {wav_path}")
+        sr = w.getframerate()
+        channels = w.getnchannels()
+        w.setpos(min(int(start * sr), w.getnframes()))
+        frames = w.readframes(int(duration * sr))
+
+    data = np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+    if channels > 1:
+        data = data.reshape(-1, channels).mean(axis=1)
+    return torch.from_numpy(data).unsqueeze(0), sr
+
+
+class SpeakerLinker:
+    """
+    Map per-window speaker labels to global ones: each local speaker
+    embedding joins the most similar global centroid (cosine > threshold)
+    or starts a new global speaker.
+    """
+
+    def __init__(self, threshold=0.5):
+        self.threshold = threshold
+        self.centroids = []
+
+    def link(self, window_index, labels, embeddings):
+        import numpy as np
+
+        if embeddings is None:
+            # No embeddings from the pipeline: keep window-local labels.
+            return {label: f"W{window_index:03d}_{label}" for label in labels}
+
+        mapping = {}
+        used = set()
+        for label, emb in zip(labels, embeddings):
+            emb = np.asarray(emb, dtype=np.float32)
+            norm = np.linalg.norm(emb)
+            if not np.isfinite(norm) or norm == 0:
+                mapping[label] = f"W{window_index:03d}_{label}"
+                continue
+            emb = emb / norm
+
+            best, best_sim = None, self.threshold
+            for j, centroid in enumerate(self.centroids):
+                if j in used:
+                    continue
+                sim = float(centroid @ emb / np.linalg.norm(centroid))
+                if sim > best_sim:
+                    best, best_sim = j, sim
+
+            if best is None:
+                self.centroids.append(emb)
+                best = len(self.centroids) - 1
+            else:
+                self.centroids[best] = self.centroids[best] + emb
+            used.add(best)
+            mapping[label] = f"SPEAKER_{best:02d}"
+        return mapping
+
+
+def extract_speaker_diarization_windowed(wav_path, output_dir, window_s=600, overlap_s=10,
+                                         hf_token=None, link_threshold=0.5, merge_gap=0.25):
+    """
+    Long-video variant of extract_speaker_diarization: run pyannote on
+    fixed windows read straight from the WAV, so memory is bounded by one
+    window instead of the whole recording. Runs in-process.
+
+    Window edges are stitched in two steps. Speakers are linked across
+    windows by embedding similarity (SpeakerLinker). Segments of the same
+    speaker that overlap, or are less than merge_gap apart, across an edge
+    are merged into one segment. Finished segments are appended to the
+    RTTM and JSONL outputs in start order, as soon as no later window can
+    extend them or add an earlier one, so the index is chronological as
+    with parse_rttm.
+
+    Returns:
+        Path: speaker_diarization.json
+    """
+    wav_path = Path(wav_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if not wav_path.exists():
+        raise FileNotFoundError(f"WAV not found: {wav_path}")
+
+    safe_uri = re.sub(r"[^\w\-]", "_", wav_path.stem)
+    rttm_path = output_dir / f"{safe_uri}.rttm"
+    jsonl_path = output_dir / "speaker_diarization.jsonl"
+    json_path = output_dir / "speaker_diarization.json"
+    rttm_path.unlink(missing_ok=True)
+    jsonl_path.unlink(missing_ok=True)
+
+    pipeline = load_diarization_pipeline(hf_token)
+    linker = SpeakerLinker(link_threshold)
+    total = wav_duration(wav_path)
+    print(f"Running windowed speaker diarization on {total:.0f} s ({window_s} s windows)")
+
+    pending = {}   # open segment per speaker, may still grow
+    finished = []  # closed segments not written yet
+    count = 0
+
+    def close(speaker):
+        finished.append({"speaker": speaker, **pending.pop(speaker)})
+
+    def flush():
+        """Write closed segments that start before every open one, in start order."""
+        nonlocal count
+        limit = min((seg["start"] for seg in pending.values()), default=float("inf"))
+        finished.sort(key=lambda seg: seg["start"])
+        ready = [seg for seg in finished if seg["start"] < limit or not pending]
+        del finished[:len(ready)]
+        with open(rttm_path, "a") as f:
+            for seg in ready:
+                f.write(f"SPEAKER {safe_uri} 1 {seg['start']:.3f} {seg['end'] - seg['start']:.3f} "
+                        f"<NA> <NA> {seg['speaker']} <NA> <NA>\n")
+                append_jsonl(jsonl_path, {"index": count, **seg})
+                count += 1
+
+    window_index = 0
+    start = 0.0
+    while start < total:
+        end = min(start + window_s, total)
+        waveform, sr = read_wav_window(wav_path, start, min(end + overlap_s, total) - start)
+        diarization = pipeline({"waveform": waveform, "sample_rate": sr})
+
+        annotation = diarization.speaker_diarization
+        labels = annotation.labels()
+        mapping = linker.link(window_index, labels, getattr(diarization, "speaker_embeddings", None))
+
+        last_window = end >= total
+        for segment, _, label in annotation.itertracks(yield_label=True):
+            seg_start, seg_end = start + segment.start, start + segment.end
+            if not last_window and seg_start >= end:
+                continue  # the next window covers it
+            speaker = mapping[label]
+            prev = pending.get(speaker)
+            if prev is not None and seg_start <= prev["end"] + merge_gap:
+                prev["end"] = max(prev["end"], seg_end)
+                continue
+            if prev is not None:
+                close(speaker)
+            pending[speaker] = {"start": seg_start, "end": seg_end}
+
+        # Segments that end before the next window can no longer grow.
+        for speaker in [s for s, seg in pending.items() if seg["end"] + merge_gap < end]:
+            close(speaker)
+        flush()
+
+        print(f"Diarized up to {end:.0f}/{total:.0f} s ({count} segments written)")
+        window_index += 1
+        start = end
+
+    for speaker in list(pending):
+        close(speaker)
+    flush()
+
+    jsonl_to_json(jsonl_path, json_path, indent=4)
+    print(f"RTTM saved to {rttm_path}")
+    print(f"Speaker diarization JSON saved to {json_path}")
+    print(f"Detected {count} segments, {len(linker.centroids)} linked speakers")
+    return json_path
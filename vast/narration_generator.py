@@ -5,12 +5,19 @@ Each summary is converted to speech (mp3/wav).
 
 """
 
-from gtts import gTTS
 from pathlib import Path
 import json
 from tqdm import tqdm
 
 
+def synthesize_speech(text, audio_path, lang="de"):
+    """Convert one text to speech and save it as mp3 (gTTS)."""
+    from gtts import gTTS
+
+    tts = gTTS(text, lang=lang)
+    tts.save(str(audio_path))
+
+
 def generate_narration_from_summaries(summaries_json, output_dir="data/audio", lang="de"):
     """
     Generate narration (text-to-speech) audio for each summarized scene.
@@ -42,8 +49,7 @@ def generate_narration_from_summaries(summaries_json, output_dir="data/audio", l
         audio_path = output_dir / f"scene_{i:03d}.mp3"
 
         try:
-            tts = gTTS(text, lang=lang)
-            tts.save(str(audio_path))
+            synthesize_speech(text, audio_path, lang=lang)
             print(f"Saved narration: {audio_path.name}")
         except Exception as e:
             print(f"Failed to generate narration for section {i}: {e}")
@@ -1,55 +1,347 @@
+"""
+pipeline.py
+----------------------------------------
+Config-driven pipeline steps. Each step reads its paths and model
+settings from config.yaml and imports its stage module only when it
+runs, so cheap steps never load Whisper, torch or transformers.
+----------------------------------------
+"""
+
+import json
 from pathlib import Path
-from vast.video_downloader import download_video
-from vast.subtitle_generator import generate_subtitle
-from vast.keyframe_extractor import extract_keyframes
-from vast.scene_analyzer import analyze_scene
-from vast.utils import setup_logger
+from vast.utils import files_fingerprint, get_hf_token, peak_rss_mb, setup_logger, window_seconds
 
 logger = setup_logger()
 
+# Rough CPU memory footprints used to size long-video windows.
+WHISPER_MODEL_MB = {"tiny": 150, "base": 300, "small": 900, "medium": 2500, "large": 5000, "turbo": 3000}
+WHISPER_BYTES_PER_SECOND = 256 * 1024   # float32 audio + mel + decoder copies
+DIARIZATION_MODEL_MB = 600
+DIARIZATION_BYTES_PER_SECOND = 512 * 1024
+
+
+def _long_video(cfg):
+    long_cfg = cfg.get("long_video", {})
+    return long_cfg if long_cfg.get("enabled", False) else None
+
+
+def whisper_model_mb(whisper_size):
+    """Memory estimate for a Whisper size; variants map to their family ("large-v3", "small.en")."""
+    for family, mb in WHISPER_MODEL_MB.items():
+        if whisper_size.startswith(family):
+            return mb
+    return WHISPER_MODEL_MB["large"]
+
 
-def run_pipeline(url):
+def _check_memory(cfg, step):
     """
-    Run the full video summarization pipeline.
+    Log the process peak RSS after a step and warn when it exceeds the
+    long-video budget. The peak covers the whole process, so later steps
+    of one run report at least the earlier steps' peak.
+    """
+    long_cfg = _long_video(cfg)
+    peak = peak_rss_mb()
+    budget = long_cfg.get("memory_budget_mb", 4096) if long_cfg else None
+    if budget and peak > budget:
+        logger.warning(f"after {step}: process peak RSS {peak:.0f} MB exceeds budget {budget} MB")
+    else:
+        logger.info(f"after {step}: process peak RSS {peak:.0f} MB")
 
-    Steps:
-        1. Download the video from the given URL.
-        2. Generate subtitles using the Whisper model.
-        3. Extract keyframes from the video using FFmpeg.
-        4. Analyze each keyframe using the BLIP model for scene descriptions.
 
-    Args:
-        url: The video URL to process.
-    """
-    # Define base data directories
-    base_dir = Path("data")
-    dirs = {
-        "raw": base_dir / "raw_videos",
-        "sub": base_dir / "subtitles",
-        "kf": base_dir / "keyframes",
-        "desc": base_dir / "scene_descriptions"
-    }
-
-    # Create directories if they don't exist
-    for d in dirs.values():
-        d.mkdir(parents=True, exist_ok=True)
-
-    # Step 1: Download the video
+def _latest(folder, pattern):
+    files = sorted(Path(folder).glob(pattern), key=lambda p: p.stat().st_mtime)
+    if not files:
+        raise FileNotFoundError(f"No {pattern} found in {folder}")
+    return files[-1]
+
+
+def resolve_video(cfg, video=None):
+    """Given video path, or the most recent .mp4 in paths.raw_videos."""
+    return Path(video) if video else _latest(cfg.paths.raw_videos, "*.mp4")
+
+
+def resolve_wav(cfg, wav=None, video=None):
+    if wav:
+        return Path(wav)
+    if video:
+        return Path(cfg.paths.raw_audios) / f"{Path(video).stem}.wav"
+    return _latest(cfg.paths.raw_audios, "*.wav")
+
+
+def resolve_subtitles_json(cfg, subtitles_json=None, video=None):
+    if subtitles_json:
+        return Path(subtitles_json)
+    if video:
+        return Path(cfg.paths.subtitles) / f"{Path(video).stem}_subtitles.json"
+    return _latest(cfg.paths.subtitles, "*_subtitles.json")
+
+
+def download(cfg, url=None, force=False):
+    """Download the video and extract WAV audio, reusing an earlier download of the same URL."""
+    from vast.video_downloader import download_video, find_download
+
+    url = url or cfg.video_downloader.video_url
+    if not force:
+        found = find_download(url, Path(cfg.paths.raw_videos), Path(cfg.paths.raw_audios))
+        if found:
+            logger.info(f"Video already downloaded: {found[0]}")
+            return found
     logger.info(f"Downloading video from: {url}")
-    video_path = download_video(url, dirs["raw"])
+    return download_video(url, Path(cfg.paths.raw_videos), Path(cfg.paths.raw_audios))
+
+
+def subtitles(cfg, video=None, force=False):
+    video_path = resolve_video(cfg, video)
+    output_dir = Path(cfg.paths.subtitles)
+    json_path = resolve_subtitles_json(cfg, video=video_path)
+    srt_path = output_dir / f"{video_path.stem}.srt"
 
-    # Step 2: Generate subtitles
+    if json_path.exists() and not force:
+        logger.info(f"Subtitles already exist: {json_path}")
+        if not srt_path.exists():
+            srt(cfg, json_path)
+        return {"srt_path": srt_path, "json_path": json_path}
+
+    model_cfg = cfg.subtitle_generator.model
+    long_cfg = _long_video(cfg)
     logger.info("Generating subtitles using Whisper...")
-    generate_subtitle(video_path, dirs["sub"])
 
-    # Step 3: Extract keyframes
-    logger.info("Extracting keyframes with FFmpeg...")
-    extract_keyframes(video_path, dirs["kf"])
+    if long_cfg:
+        from vast.subtitle_generator import generate_subtitle_windowed
+
+        window_s = window_seconds(
+            long_cfg.get("memory_budget_mb", 4096),
+            WHISPER_BYTES_PER_SECOND,
+            whisper_model_mb(model_cfg.get("whisper_size", "base")),
+            long_cfg.get("max_window_s", 600),
+        )
+        result = generate_subtitle_windowed(video_path, output_dir, model_cfg,
+                                            window_s, long_cfg.get("overlap_s", 10))
+    else:
+        from vast.subtitle_generator import generate_subtitle
+
+        result = generate_subtitle(video_path, output_dir, model_cfg)
+
+    _check_memory(cfg, "subtitles")
+    return result
+
+
+def srt(cfg, subtitles_json=None):
+    from vast.subtitle_generator import json_to_srt
+
+    return json_to_srt(resolve_subtitles_json(cfg, subtitles_json))
+
+
+def shots(cfg, video=None):
+    from vast.keyframe_extractor.camerashot_detector import extract_visual_keyframes
+
+    return extract_visual_keyframes(resolve_video(cfg, video), Path(cfg.paths.keyframes) / "visual")
+
+
+def diarize(cfg, wav=None):
+    long_cfg = _long_video(cfg)
+    wav_path = resolve_wav(cfg, wav)
+    output_dir = Path(cfg.paths.keyframes) / "audio"
+
+    if long_cfg:
+        from vast.keyframe_extractor.speaker_diarization import extract_speaker_diarization_windowed
+
+        window_s = window_seconds(
+            long_cfg.get("memory_budget_mb", 4096),
+            DIARIZATION_BYTES_PER_SECOND,
+            DIARIZATION_MODEL_MB,
+            long_cfg.get("max_window_s", 600),
+        )
+        result = extract_speaker_diarization_windowed(wav_path, output_dir, window_s,
+                                                      long_cfg.get("overlap_s", 10),
+                                                      hf_token=get_hf_token(cfg))
+    else:
+        from vast.keyframe_extractor.speaker_diarization import extract_speaker_diarization
+
+        result = extract_speaker_diarization(wav_path, output_dir, hf_token=get_hf_token(cfg))
+
+    _check_memory(cfg, "diarize")
+    return result
+
+
+def keyframes(cfg, video=None, force=False):
+    """
+    Sample one keyframe every keyframe_extractor.interval seconds into
+    paths.keyframes. Skipped if the existing keyframes were extracted
+    from the same video at the same interval (keyframes.json), unless force.
+    """
+    from vast.keyframe_extractor.interval_sampler import (
+        extract_interval_keyframes, keyframes_source, read_manifest,
+    )
+
+    video_path = resolve_video(cfg, video)
+    output_dir = Path(cfg.paths.keyframes)
+    interval = cfg.keyframe_extractor.interval
+    existing = sorted(output_dir.glob("frame_*.jpg"))
+    if (existing and not force
+            and read_manifest(output_dir) == keyframes_source(video_path, interval)):
+        logger.info(f"Keyframes already exist: {len(existing)} in {output_dir}")
+        return existing
+    return extract_interval_keyframes(video_path, output_dir, interval)
+
+
+def keyframe_list(cfg):
+    keyframes = sorted(Path(cfg.paths.keyframes).glob("*.jpg"))
+    if not keyframes:
+        raise FileNotFoundError(f"No keyframes found in {cfg.paths.keyframes} "
+                                f"(run `vast keyframes` first)")
+    return keyframes
+
+
+def similarity_path(cfg):
+    method = cfg.keyframe_extractor.get("similarity", "ssim")
+    return Path(cfg.paths.keyframes) / f"similarity_{method}.json"
+
+
+def similarity(cfg, force=False):
+    """
+    Per-keyframe similarity scores, stored next to the keyframes and
+    reused as long as the keyframe files are unchanged.
+    """
+    keyframes = keyframe_list(cfg)
+    method = cfg.keyframe_extractor.get("similarity", "ssim")
+    cache_path = similarity_path(cfg)
+    fingerprint = files_fingerprint(keyframes)
+
+    if cache_path.exists() and not force:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("keyframes_fingerprint") == fingerprint:
+            logger.info(f"Reusing keyframe similarity scores: {cache_path}")
+            return cached["similarities"]
+
+    from vast.scene_segmenter import compute_similarities
+
+    scores = compute_similarities(keyframes, method)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "method": method,
+            "keyframes_fingerprint": fingerprint,
+            "keyframes": [k.name for k in keyframes],
+            "similarities": scores,
+        }, f, indent=2)
+    logger.info(f"Keyframe similarity scores saved to {cache_path}")
+    return scores
+
+
+def scenes(cfg):
+    """Scene boundaries from the (cached) similarity scores and keyframe_extractor.threshold."""
+    from vast.scene_segmenter import scenes_from_similarities
+
+    kf_cfg = cfg.keyframe_extractor
+    return scenes_from_similarities(similarity(cfg), interval=kf_cfg.interval, threshold=kf_cfg.threshold)
+
+
+def export(cfg, scenes, video=None):
+    """Export scene clips to paths.sections, replacing the clips of a previous segmentation."""
+    from vast.scene_segmenter import export_scenes
+
+    output_dir = Path(cfg.paths.sections)
+    for old_clip in output_dir.glob("scene_*.mp4"):
+        old_clip.unlink()
+    return export_scenes(resolve_video(cfg, video), scenes, output_dir)
+
+
+def segment(cfg, video=None, export_only=False):
+    """
+    Detect scenes on the keyframes in paths.keyframes and export the clips.
+    Keyframes are (re-)extracted first if they are missing or stale.
+    Similarity scores are cached, so a new threshold decodes no frames.
+    With export_only, re-export the scenes stored in scene_segments.json.
+    """
+    if export_only:
+        with open(Path(cfg.paths.sections) / "scene_segments.json", "r", encoding="utf-8") as f:
+            detected = [(s["start"], s["end"]) for s in json.load(f)]
+    else:
+        keyframes(cfg, video)  # re-extracts if the video or interval changed
+        detected = scenes(cfg)
+
+    result = export(cfg, detected, video)
+    _check_memory(cfg, "segment")
+    return result
+
+
+def analyze(cfg):
+    from vast.scene_analyzer import analyze_directory
 
-    # Step 4: Analyze each scene
     logger.info("Analyzing scenes with BLIP model...")
-    for img in dirs["kf"].glob(f"{video_path.stem}_*.jpg"):
-        caption = analyze_scene(img)
-        (dirs["desc"] / f"{img.stem}.txt").write_text(caption, encoding="utf-8")
+    result = analyze_directory(
+        Path(cfg.paths.keyframes),
+        Path(cfg.paths.scene_descriptions),
+        cfg.scene_analyzer.model.name,
+        precision=cfg.scene_analyzer.model.get("precision", "fp32"),
+        sentiment_model=cfg.text_analysis.sentiment_model,
+        sentiment_precision=cfg.text_analysis.get("sentiment_precision", "fp32"),
+        max_new_tokens=cfg.scene_analyzer.get("max_caption_length", 50),
+    )
+    _check_memory(cfg, "analyze")
+    return result
+
+
+def summarize(cfg, subtitles_json=None, reuse=False):
+    """
+    Summarize the subtitles of each scene. With reuse, sections whose
+    text is unchanged keep their summary from the previous
+    text_summaries.json (only valid if the summarizer settings are the same).
+    """
+    from vast.text_summarizer import summarize_sections
+
+    output_json = Path(cfg.paths.text_analysis) / "text_summaries.json"
+    result = summarize_sections(
+        subtitles_json=resolve_subtitles_json(cfg, subtitles_json),
+        segments_json=Path(cfg.paths.sections) / "scene_segments.json",
+        output_json=output_json,
+        summarizer_model=cfg.text_analysis.summarizer_model,
+        language=cfg.subtitle_generator.model.language,
+        precision=cfg.text_analysis.get("summarizer_precision", "fp32"),
+        stream=_long_video(cfg) is not None,
+        previous_json=output_json if reuse else None,
+    )
+    _check_memory(cfg, "summarize")
+    return result
+
+
+def narrate(cfg):
+    """Narration audio for the scene summaries, replacing the audio of a previous segmentation."""
+    from vast.narration_generator import generate_narration_from_summaries
+
+    for old_audio in Path(cfg.paths.audio).glob("scene_*.mp3"):
+        old_audio.unlink()
+    return generate_narration_from_summaries(
+        summaries_json=Path(cfg.paths.text_analysis) / "text_summaries.json",
+        output_dir=cfg.paths.audio,
+        lang=cfg.subtitle_generator.model.language,
+    )
+
+
+def run_pipeline(cfg, url=None):
+    """
+    Run the full video summarization pipeline.
+
+    Steps:
+        1. Download the video and extract WAV audio.
+        2. Generate subtitles using the Whisper model.
+        3. Extract one keyframe per keyframe_extractor.interval with FFmpeg.
+        4. Detect scenes on the keyframes and export the clips.
+        5. Describe each keyframe with BLIP.
+        6. Summarize the subtitles of each scene.
+        7. Generate narration audio from the summaries.
+
+    Args:
+        cfg (Box): loaded config.yaml
+        url: The video URL to process (default: video_downloader.video_url).
+    """
+    video_path, _ = download(cfg, url)
+    subtitles(cfg, video_path)
+    keyframes(cfg, video_path)
+    segment(cfg, video_path)
+    analyze(cfg)
+    summarize(cfg, resolve_subtitles_json(cfg, video=video_path))
+    narrate(cfg)
 
     logger.info("Pipeline completed successfully.")
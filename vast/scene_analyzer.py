@@ -1,48 +1,66 @@
 
-import json
 import random
+import threading
 from pathlib import Path
 from PIL import Image
-import torch
-from transformers import (
-    BlipProcessor, BlipForConditionalGeneration,
-    pipeline
-)
 
+from vast import inference_client
+from vast.utils import append_jsonl, apply_precision, jsonl_to_json
 
-_processor = None
-_model = None
-_loaded_model_name = None
 
+_blip_models = {}
+_blip_lock = threading.Lock()
 
 
-def load_blip_model(model_name):
-    """Load BLIP image captioning model (only once)."""
-    global _processor, _model, _loaded_model_name
 
-    if _processor is not None and _model is not None and _loaded_model_name == model_name:
-        return _processor, _model
+def load_blip_model(model_name, precision="fp32"):
+    """Load BLIP image captioning model (cached per model name and precision, thread-safe)."""
+    with _blip_lock:
+        if (model_name, precision) not in _blip_models:
+            import torch
+            from transformers import BlipProcessor, BlipForConditionalGeneration
 
-    print(f"Loading BLIP model: {model_name} ...")
-    _processor = BlipProcessor.from_pretrained(model_name)
-    _model = BlipForConditionalGeneration.from_pretrained(model_name)
-    _model.to("cuda" if torch.cuda.is_available() else "cpu")
-    _loaded_model_name = model_name
-    print("BLIP model loaded successfully.")
-    return _processor, _model
+            print(f"Loading BLIP model: {model_name} ...")
+            processor = BlipProcessor.from_pretrained(model_name)
+            model = BlipForConditionalGeneration.from_pretrained(model_name)
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model.to(device)
+            model = apply_precision(model, precision, device)
+            _blip_models[(model_name, precision)] = (processor, model)
+            print("BLIP model loaded successfully.")
+        return _blip_models[(model_name, precision)]
 
 
 
-def generate_scene_description(image_path, model_name):
-    """Generate a scene caption using BLIP."""
-    processor, model = load_blip_model(model_name)
+def generate_scene_description(image_path, model_name, precision="fp32", max_new_tokens=50):
+    """Generate a scene caption using BLIP (on the inference server if one is configured)."""
+    if inference_client.enabled():
+        try:
+            return inference_client.caption([image_path], model_name, precision, max_new_tokens)[0]
+        except inference_client.ServerUnavailable:
+            pass
+
+    processor, model = load_blip_model(model_name, precision)
     img = Image.open(image_path).convert("RGB")
     inputs = processor(img, return_tensors="pt").to(model.device)
-    output = model.generate(**inputs, max_new_tokens=50)
+    if precision == "bf16":
+        inputs["pixel_values"] = inputs["pixel_values"].to(model.dtype)
+    output = model.generate(**inputs, max_new_tokens=max_new_tokens)
     caption = processor.decode(output[0], skip_special_tokens=True)
     return caption
 
 
+def generate_scene_descriptions(image_paths, model_name, precision="fp32", max_new_tokens=50):
+    """Caption a batch of images in one generate() call (used by the inference server)."""
+    processor, model = load_blip_model(model_name, precision)
+    images = [Image.open(p).convert("RGB") for p in image_paths]
+    inputs = processor(images=images, return_tensors="pt").to(model.device)
+    if precision == "bf16":
+        inputs["pixel_values"] = inputs["pixel_values"].to(model.dtype)
+    output = model.generate(**inputs, max_new_tokens=max_new_tokens)
+    return [processor.decode(o, skip_special_tokens=True) for o in output]
+
+
 
 def detect_speaker_position(image_path):
     """
@@ -70,30 +88,54 @@ def detect_emotion_from_caption(caption):
 
 
 
-_sentiment_classifier = None
+_sentiment_classifiers = {}
+_sentiment_lock = threading.Lock()
 
-def load_sentiment_model(model_name="cardiffnlp/twitter-roberta-base-sentiment"):
-    """Load sentiment analysis model (cached)."""
-    global _sentiment_classifier
-    if _sentiment_classifier is None:
-        print(f"Loading sentiment model: {model_name}")
-        _sentiment_classifier = pipeline("sentiment-analysis", model=model_name)
-    return _sentiment_classifier
+def load_sentiment_model(model_name="cardiffnlp/twitter-roberta-base-sentiment", precision="fp32"):
+    """Load sentiment analysis model (cached per model name and precision, thread-safe)."""
+    with _sentiment_lock:
+        if (model_name, precision) not in _sentiment_classifiers:
+            from transformers import pipeline
 
+            print(f"Loading sentiment model: {model_name}")
+            classifier = pipeline("sentiment-analysis", model=model_name)
+            classifier.model = apply_precision(classifier.model, precision, classifier.device)
+            _sentiment_classifiers[(model_name, precision)] = classifier
+        return _sentiment_classifiers[(model_name, precision)]
 
-def analyze_sentiment(caption, model_name="cardiffnlp/twitter-roberta-base-sentiment"):
+
+def analyze_sentiment(caption, model_name="cardiffnlp/twitter-roberta-base-sentiment", precision="fp32"):
     """Analyze sentiment from generated caption."""
-    classifier = load_sentiment_model(model_name)
+    if inference_client.enabled():
+        try:
+            return inference_client.sentiment([caption], model_name, precision)[0]
+        except inference_client.ServerUnavailable:
+            pass
+
+    classifier = load_sentiment_model(model_name, precision)
     result = classifier(caption[:512])[0]
     return result["label"]
 
 
+def analyze_sentiments(texts, model_name="cardiffnlp/twitter-roberta-base-sentiment", precision="fp32"):
+    """Sentiment labels for a batch of texts (used by the inference server)."""
+    classifier = load_sentiment_model(model_name, precision)
+    results = classifier([t[:512] for t in texts], batch_size=len(texts))
+    return [r["label"] for r in results]
 
-def analyze_directory(image_dir, output_dir, model_name="Salesforce/blip-image-captioning-base"):
+
+
+def analyze_directory(image_dir, output_dir, model_name="Salesforce/blip-image-captioning-base",
+                      precision="fp32",
+                      sentiment_model="cardiffnlp/twitter-roberta-base-sentiment",
+                      sentiment_precision="fp32", max_new_tokens=50):
     """
     Analyze all .jpg images in a directory.
     For each image, detect scene description, speaker position, emotion, and sentiment.
-    Save results to JSON.
+    Results are appended to scene_analysis.jsonl as they are produced
+    and collected into scene_analysis.json at the end.
+    precision / sentiment_precision: "fp32", "int8" or "bf16" (see utils.apply_precision).
+    max_new_tokens: caption length limit (scene_analyzer.max_caption_length).
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     images = sorted(Path(image_dir).glob("*.jpg"))
@@ -101,14 +143,16 @@ def analyze_directory(image_dir, output_dir, model_name="Salesforce/blip-image-c
         print(f"No .jpg files found in {image_dir}")
         return None
 
-    results = []
+    output_json = Path(output_dir) / "scene_analysis.json"
+    jsonl_path = output_json.with_suffix(".jsonl")
+    jsonl_path.unlink(missing_ok=True)
 
     for img_path in images:
         print(f"Analyzing: {img_path.name}")
-        scene_desc = generate_scene_description(img_path, model_name)
+        scene_desc = generate_scene_description(img_path, model_name, precision, max_new_tokens)
         position = detect_speaker_position(img_path)
         emotion = detect_emotion_from_caption(scene_desc)
-        sentiment = analyze_sentiment(scene_desc)
+        sentiment = analyze_sentiment(scene_desc, sentiment_model, sentiment_precision)
 
         result = {
             "image": str(img_path),
@@ -117,12 +161,10 @@ def analyze_directory(image_dir, output_dir, model_name="Salesforce/blip-image-c
             "sentiment": sentiment,
             "scene_description": scene_desc
         }
-        results.append(result)
+        append_jsonl(jsonl_path, result)
 
     # Save results to JSON
-    output_json = Path(output_dir) / "scene_analysis.json"
-    with open(output_json, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    jsonl_to_json(jsonl_path, output_json)
 
     print(f" Scene analysis JSON saved to {output_json}")
     return output_json
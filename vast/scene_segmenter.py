@@ -1,16 +1,14 @@
-import cv2
 import json
 import ffmpeg
-import numpy as np
 from tqdm import tqdm
 from pathlib import Path
-from skimage.metrics import structural_similarity as ssim
-from sentence_transformers import SentenceTransformer, util
 
 
 def load_model(method="ssim", model_name="clip-ViT-B-32"):
     """Load CLIP model if needed."""
     if method == "clip":
+        from sentence_transformers import SentenceTransformer
+
         print(f"Loading CLIP model: {model_name}")
         return SentenceTransformer(model_name)
     return None
@@ -18,7 +16,11 @@ def load_model(method="ssim", model_name="clip-ViT-B-32"):
 
 def compute_similarity(img1, img2, method="ssim", model=None):
     """Compute similarity between two frames."""
+    import cv2
+
     if method == "ssim":
+        from skimage.metrics import structural_similarity as ssim
+
         gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
         gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
         score = ssim(gray1, gray2)
@@ -27,6 +29,8 @@ def compute_similarity(img1, img2, method="ssim", model=None):
     elif method == "clip":
         if model is None:
             raise ValueError("CLIP model required for 'clip' method.")
+        from sentence_transformers import util
+
         emb1 = model.encode(cv2.cvtColor(img1, cv2.COLOR_BGR2RGB), convert_to_tensor=True)
         emb2 = model.encode(cv2.cvtColor(img2, cv2.COLOR_BGR2RGB), convert_to_tensor=True)
         score = util.cos_sim(emb1, emb2).item()
@@ -36,31 +40,50 @@ def compute_similarity(img1, img2, method="ssim", model=None):
         raise ValueError(f"Unsupported method: {method}")
 
 
-def detect_scenes(keyframes, interval=60.0, method="ssim", threshold=0.6, model_name="clip-ViT-B-32"):
-    """Detect scene boundaries based on keyframe similarity."""
+def compute_similarities(keyframes, method="ssim", model_name="clip-ViT-B-32"):
+    """Similarity of each keyframe to the previous one (len(keyframes) - 1 scores)."""
+    import cv2
+
     model = load_model(method, model_name)
-    scenes = []
-    start_time = 0.0
+    similarities = []
     prev_img = cv2.imread(str(keyframes[0]))
-    total_frames = len(keyframes)
 
-    for i in tqdm(range(1, total_frames), desc="Detecting scene boundaries"):
+    for i in tqdm(range(1, len(keyframes)), desc="Computing keyframe similarity"):
         curr_img = cv2.imread(str(keyframes[i]))
-        sim = compute_similarity(prev_img, curr_img, method, model)
+        similarities.append(float(compute_similarity(prev_img, curr_img, method, model)))
+        prev_img = curr_img
+
+    return similarities
+
+
+def scenes_from_similarities(similarities, interval=60.0, threshold=0.6):
+    """
+    Cut wherever 1 - similarity exceeds threshold. Works on stored scores,
+    so re-segmenting with a new threshold decodes no frames.
+    """
+    scenes = []
+    start_time = 0.0
+
+    for i, sim in enumerate(similarities, start=1):
         diff = 1 - sim
 
         if diff > threshold:
             end_time = i * interval
             scenes.append((start_time, end_time))
             start_time = end_time
-        prev_img = curr_img
 
     # Add the final segment
-    scenes.append((start_time, total_frames * interval))
+    scenes.append((start_time, (len(similarities) + 1) * interval))
     print(f"Detected {len(scenes)} scenes.")
     return scenes
 
 
+def detect_scenes(keyframes, interval=60.0, method="ssim", threshold=0.6, model_name="clip-ViT-B-32"):
+    """Detect scene boundaries based on keyframe similarity."""
+    similarities = compute_similarities(keyframes, method, model_name)
+    return scenes_from_similarities(similarities, interval, threshold)
+
+
 def export_scenes(video_path, scenes, output_dir):
     """
     Export segmented video clips using FFmpeg
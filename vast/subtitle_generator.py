@@ -1,11 +1,84 @@
-import whisper
 import json
+import subprocess
+import threading
 from pathlib import Path
 from box import Box
 
+from vast import inference_client
+from vast.utils import append_jsonl, apply_thread_settings, jsonl_to_json
 
-def generate_subtitle(video_path, output_dir, model_cfg):
 
+SAMPLE_RATE = 16000
+
+_whisper_models = {}
+_whisper_lock = threading.Lock()
+
+
+def load_whisper_model(whisper_size):
+    """Load a Whisper model (cached per size, thread-safe)."""
+    with _whisper_lock:
+        if whisper_size not in _whisper_models:
+            import whisper
+
+            apply_thread_settings()
+            print(f"Loading Whisper model: {whisper_size}")
+            _whisper_models[whisper_size] = whisper.load_model(whisper_size)
+        return _whisper_models[whisper_size]
+
+
+def load_audio_window(media_path, start, duration, sr=SAMPLE_RATE):
+    """Decode only [start, start + duration) of the audio track (same format as whisper.load_audio)."""
+    import numpy as np
+
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-ss", f"{start:.3f}",
+        "-t", f"{duration:.3f}",
+        "-i", str(media_path),
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sr),
+        "-",
+    ]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def transcribe(media_path, whisper_size="base", language=None, start=None, duration=None):
+    """
+    Run Whisper and keep only the JSON-friendly parts of the result.
+    With start/duration only that window is decoded; timestamps stay
+    relative to the whole file.
+    """
+    model = load_whisper_model(whisper_size)
+    if start is None:
+        audio, offset = str(media_path), 0.0
+    else:
+        audio, offset = load_audio_window(media_path, start, duration), float(start)
+
+    result = model.transcribe(audio, language=language)
+    return {
+        "language": result.get("language"),
+        "segments": [
+            {"start": float(seg["start"]) + offset, "end": float(seg["end"]) + offset, "text": seg["text"]}
+            for seg in result["segments"]
+        ],
+    }
+
+
+def _transcribe(media_path, whisper_size, language, start=None, duration=None):
+    """transcribe() on the inference server if configured, else in-process."""
+    if inference_client.enabled():
+        try:
+            return inference_client.transcribe(media_path, whisper_size, language, start, duration)
+        except inference_client.ServerUnavailable:
+            pass
+    return transcribe(media_path, whisper_size, language, start, duration)
+
+
+def generate_subtitle(video_path, output_dir, model_cfg):
     if isinstance(model_cfg, Box):
         model_cfg = model_cfg.to_dict()
 
@@ -16,11 +89,8 @@ def generate_subtitle(video_path, output_dir, model_cfg):
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"Loading Whisper model: {whisper_size}")
-    model = whisper.load_model(whisper_size)
-
     print(f"Transcribing audio... (language={language or 'auto'})")
-    result = model.transcribe(str(video_path), language=language)
+    result = _transcribe(video_path, whisper_size, language)
 
     srt_path = output_dir / f"{video_path.stem}.srt"
     with open(srt_path, "w", encoding="utf-8") as f:
@@ -45,9 +115,90 @@ def generate_subtitle(video_path, output_dir, model_cfg):
     return {"srt_path": srt_path, "json_path": json_path}
 
 
-def write_srt(segments, file_obj):
+def generate_subtitle_windowed(video_path, output_dir, model_cfg, window_s=600, overlap_s=10):
+    """
+    Long-video variant of generate_subtitle: transcribe fixed windows,
+    append each window's segments to <stem>_subtitles.jsonl and the .srt,
+    and build the JSON array at the end. Memory stays bounded by one window.
+
+    Stitching: a window runs `overlap_s` past its nominal end. Segments
+    starting before the nominal end are kept whole, and the next window
+    starts where the last kept segment ends, so no segment is cut in two.
+    """
+    from vast.video_downloader import get_media_duration
+
+    if isinstance(model_cfg, Box):
+        model_cfg = model_cfg.to_dict()
+
+    whisper_size = model_cfg.get("whisper_size", "base")
+    language = model_cfg.get("language", None)
+
+    video_path = Path(video_path)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    srt_path = output_dir / f"{video_path.stem}.srt"
+    json_path = output_dir / f"{video_path.stem}_subtitles.json"
+    jsonl_path = output_dir / f"{video_path.stem}_subtitles.jsonl"
+    srt_path.unlink(missing_ok=True)
+    jsonl_path.unlink(missing_ok=True)
+
+    total = get_media_duration(video_path)
+    print(f"Transcribing {total:.0f} s in {window_s} s windows (language={language or 'auto'})")
+
+    count = 0
+    start = 0.0
+    while start < total:
+        end = min(start + window_s, total)
+        duration = min(end + overlap_s, total) - start
+        result = _transcribe(video_path, whisper_size, language, start, duration)
+
+        last_window = end >= total
+        kept = [seg for seg in result["segments"] if last_window or seg["start"] < end]
+
+        with open(srt_path, "a", encoding="utf-8") as f:
+            write_srt(kept, f, start_index=count + 1)
+        for seg in kept:
+            count += 1
+            append_jsonl(jsonl_path, {
+                "id": count,
+                "start": round(seg["start"], 3),
+                "end": round(seg["end"], 3),
+                "text": seg["text"].strip()
+            })
+        print(f"Transcribed up to {end:.0f}/{total:.0f} s ({count} segments)")
+
+        if last_window:
+            break
+        next_start = min(kept[-1]["end"], start + duration) if kept else end
+        start = next_start if next_start > start else end
+
+    jsonl_to_json(jsonl_path, json_path)
+    print(f"Subtitle (.srt) created: {srt_path}")
+    print(f"Transcript (.json) created: {json_path}")
+
+    return {"srt_path": srt_path, "json_path": json_path}
+
+
+def json_to_srt(json_path, srt_path=None):
+    """Regenerate an .srt file from an existing transcript JSON (no Whisper needed)."""
+    json_path = Path(json_path)
+    if srt_path is None:
+        srt_path = json_path.with_name(json_path.stem.removesuffix("_subtitles") + ".srt")
+    srt_path = Path(srt_path)
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        segments = json.load(f)
+
+    with open(srt_path, "w", encoding="utf-8") as f:
+        write_srt(segments, f)
+    print(f"Subtitle (.srt) created: {srt_path}")
+    return srt_path
+
+
+def write_srt(segments, file_obj, start_index=1):
     """Write Whisper transcription results into an .srt subtitle file."""
-    for i, segment in enumerate(segments, start=1):
+    for i, segment in enumerate(segments, start=start_index):
         start = format_timestamp(segment["start"])
         end = format_timestamp(segment["end"])
         text = segment["text"].strip().replace("-->", "->")
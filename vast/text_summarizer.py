@@ -7,13 +7,70 @@ based on their subtitles (timestamp + text).
 """
 
 import json
+import threading
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from transformers import pipeline
+
+from vast import inference_client
+from vast.utils import append_jsonl, apply_precision, jsonl_to_json
+
+
+_summarizers = {}
+_summarizers_lock = threading.Lock()
+
+
+def load_summarizer(model_name, precision="fp32"):
+    """Load summarization pipeline (cached per model name and precision, thread-safe)."""
+    with _summarizers_lock:
+        if (model_name, precision) not in _summarizers:
+            from transformers import pipeline
+
+            print(f"Loading summarization model: {model_name}")
+            summarizer = pipeline("summarization", model=model_name)
+            summarizer.model = apply_precision(summarizer.model, precision, summarizer.device)
+            _summarizers[(model_name, precision)] = summarizer
+        return _summarizers[(model_name, precision)]
+
+
+def pick_summarizer_model(summarizer_model, language):
+    """Summarization model for the subtitle language."""
+    if language == "de":
+        return "ml6team/mt5-small-german-finetune-mlsum"
+    elif language == "en":
+        return summarizer_model
+    return "google/mt5-small"  # fallback multilingual model
+
+
+def collect_section_text(subtitles, start, end, starts=None):
+    """
+    Join the text of all subtitles that lie inside [start, end].
+    `starts` (sorted subtitle start times) enables a bisect lookup
+    instead of scanning every subtitle.
+    """
+    if starts is None:
+        candidates = subtitles
+    else:
+        i = bisect_left(starts, start)
+        candidates = subtitles[i:bisect_right(starts, end, lo=i)]
+    texts = [
+        s["text"] for s in candidates
+        if s["start"] >= start and s["end"] <= end
+    ]
+    return " ".join(texts).strip()
+
+
+def summarize_texts(texts, model_name, max_length=120, min_length=25, precision="fp32"):
+    """Summarize a batch of texts in one pipeline call (used by the inference server)."""
+    summarizer = load_summarizer(model_name, precision)
+    results = summarizer(list(texts), max_length=max_length, min_length=min_length,
+                         do_sample=False, batch_size=len(texts))
+    return [r["summary_text"] for r in results]
 
 
 def summarize_sections(subtitles_json, segments_json, output_json,
                        summarizer_model="facebook/bart-large-cnn",
-                       max_length=120, min_length=25, language="en"):
+                       max_length=120, min_length=25, language="en", precision="fp32",
+                       stream=False, previous_json=None):
     """
     Perform text summarization for each segmented video section.
 
@@ -25,6 +82,15 @@ def summarize_sections(subtitles_json, segments_json, output_json,
         max_length (int): Maximum tokens for summary
         min_length (int): Minimum tokens for summary
         language (str): "en", "de" etc. for model adaptation
+        precision (str): "fp32", "int8" or "bf16" (see utils.apply_precision)
+        stream (bool): long-video mode; append each section to a .jsonl
+            next to output_json instead of keeping all results in memory
+        previous_json (Path): earlier output of the same summarizer settings;
+            sections with identical text reuse its summary instead of
+            running the model (re-segmentation only changes a few sections)
+
+    Returns:
+        Path: output_json
     """
 
     subtitles_json = Path(subtitles_json)
@@ -39,35 +105,57 @@ def summarize_sections(subtitles_json, segments_json, output_json,
 
     print(f"Loaded {len(subtitles)} subtitles and {len(segments)} segments")
 
+    previous = {}
+    if previous_json and Path(previous_json).exists():
+        with open(previous_json, "r", encoding="utf-8") as f:
+            previous = {s["text"]: s["summary"] for s in json.load(f) if s.get("text")}
+
+    starts = [s["start"] for s in subtitles]
+    if any(a > b for a, b in zip(starts, starts[1:])):
+        starts = None  # unsorted input: fall back to a full scan
+
     # 加载摘要模型（多语言可切换）
-    if language == "de":
-        model_name = "ml6team/mt5-small-german-finetune-mlsum"
-    elif language == "en":
-        model_name = summarizer_model
-    else:
-        model_name = "google/mt5-small"  # fallback multilingual model
+    model_name = pick_summarizer_model(summarizer_model, language)
 
-    print(f"Loading summarization model: {model_name}")
-    summarizer = pipeline("summarization", model=model_name)
+    use_server = inference_client.enabled()
+    summarizer = None
+
+    def local_summarizer():
+        nonlocal summarizer
+        if summarizer is None:
+            summarizer = load_summarizer(model_name, precision)
+        return summarizer
+
+    output_json.parent.mkdir(parents=True, exist_ok=True)
+    jsonl_path = output_json.with_suffix(".jsonl")
+    if stream:
+        jsonl_path.unlink(missing_ok=True)
 
     results = []
+    reused = 0
     for i, seg in enumerate(segments):
         start, end = seg["start"], seg["end"]
 
         # 聚合该时间段的所有字幕文本
-        texts = [
-            s["text"] for s in subtitles
-            if s["start"] >= start and s["end"] <= end
-        ]
-        full_text = " ".join(texts).strip()
+        full_text = collect_section_text(subtitles, start, end, starts)
 
         if not full_text:
             summary = ""
+        elif full_text in previous:
+            summary = previous[full_text]
+            reused += 1
         else:
             # 执行摘要
-            result = summarizer(full_text, max_length=max_length,
-                                min_length=min_length, do_sample=False)
-            summary = result[0]["summary_text"]
+            if use_server:
+                try:
+                    summary = inference_client.summarize([full_text], model_name,
+                                                         max_length, min_length, precision)[0]
+                except inference_client.ServerUnavailable:
+                    use_server = False
+            if not use_server:
+                result = local_summarizer()(full_text, max_length=max_length,
+                                            min_length=min_length, do_sample=False)
+                summary = result[0]["summary_text"]
 
         section = {
             "start": start,
@@ -75,12 +163,22 @@ def summarize_sections(subtitles_json, segments_json, output_json,
             "text": full_text,
             "summary": summary
         }
-        results.append(section)
+        if stream:
+            append_jsonl(jsonl_path, section)
+        else:
+            results.append(section)
         print(f"Section {i}: summarized {len(full_text.split())} words.")
 
+    if reused:
+        print(f"Reused {reused} unchanged section summaries from {previous_json}")
+
     # 保存 JSON
-    output_json.parent.mkdir(parents=True, exist_ok=True)
+    if stream:
+        jsonl_to_json(jsonl_path, output_json)
+        print(f"Summaries saved to {output_json}")
+        return output_json
+
     with open(output_json, "w", encoding="utf-8") as f:
         json.dump(results, f, indent=2, ensure_ascii=False)
     print(f"Summaries saved to {output_json}")
-    return results
+    return output_json
@@ -1,7 +1,10 @@
+import hashlib
+import json
 import logging
+import os
+import sys
 import yaml
 from pathlib import Path
-import torch
 
 def setup_logger():
     logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
@@ -19,12 +22,200 @@ def load_yaml(file_path):
     return data
 
 
+def config_value(cfg, key):
+    """Value at a dotted key ("keyframe_extractor.threshold"), None if missing."""
+    value = cfg
+    for part in key.split("."):
+        if not hasattr(value, "get"):
+            return None
+        value = value.get(part)
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "to_list"):
+        return value.to_list()
+    return value
+
+
+def set_config_value(cfg, key, value):
+    """Set a dotted key in a (Box) config, creating sections as needed."""
+    *parents, last = key.split(".")
+    section = cfg
+    for part in parents:
+        if part not in section or section[part] is None:
+            section[part] = {}
+        section = section[part]
+    section[last] = value
+
+
+def append_jsonl(path, record):
+    """Append one record to a JSON Lines file (results are flushed as they are produced)."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def jsonl_to_json(jsonl_path, json_path, indent=2):
+    """Stream a JSON Lines file into a JSON array file without loading it all."""
+    jsonl_path = Path(jsonl_path)
+    count = 0
+    with open(jsonl_path, "r", encoding="utf-8") as src, open(json_path, "w", encoding="utf-8") as dst:
+        dst.write("[")
+        for line in src:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = json.dumps(record, ensure_ascii=False, indent=indent)
+            text = text.replace("\n", "\n" + " " * indent) if indent else text
+            dst.write(("," if count else "") + ("\n" + " " * indent if indent else "") + text)
+            count += 1
+        dst.write("\n]" if count and indent else "]")
+    return count
+
+
+def files_fingerprint(paths):
+    """Cheap fingerprint of a set of files from name, size and mtime (contents are not read)."""
+    h = hashlib.sha256()
+    for path in paths:
+        st = Path(path).stat()
+        h.update(f"{Path(path).name}:{st.st_size}:{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def file_digest(path, max_content_bytes=64 * 1024 * 1024):
+    """Content hash for small files (JSON outputs), stat fingerprint for large media."""
+    path = Path(path)
+    if path.stat().st_size > max_content_bytes:
+        return files_fingerprint([path])
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (Linux/macOS)."""
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def window_seconds(memory_budget_mb, bytes_per_second, fixed_mb=0, max_window_s=600, min_window_s=30):
+    """
+    Longest processing window that fits the memory budget:
+    (budget - fixed model memory) / per-second working memory.
+    """
+    available = (memory_budget_mb - fixed_mb) * 1024 * 1024
+    if available <= 0:
+        print(f"Memory budget {memory_budget_mb} MB is below the model footprint ({fixed_mb} MB)")
+        return min_window_s
+    return max(min_window_s, min(max_window_s, int(available / bytes_per_second)))
+
+
+def get_hf_token(cfg=None):
+    """
+    Resolve the Hugging Face token at call time.
+    Order: HF_TOKEN / HUGGINGFACE_TOKEN env vars, credentials.hf_token in
+    config, then a legacy local `secret_key` module.
+    """
+    token = os.environ.get("HF_TOKEN") or os.environ.get("HUGGINGFACE_TOKEN")
+    if not token and cfg is not None:
+        token = (cfg.get("credentials") or {}).get("hf_token")
+    if not token:
+        try:
+            from secret_key import hf_token as token
+        except ImportError:
+            token = None
+    return token or None
+
+
+PRECISIONS = ("fp32", "int8", "bf16")
+
+_threads = {"intra_op": None, "inter_op": None}
+
+
+def configure_threads(intra_op_threads=0, inter_op_threads=0, workers=1):
+    """
+    Set per-worker torch thread counts so parallel workers don't
+    oversubscribe cores. With intra_op_threads=0 and several workers,
+    each worker gets cpu_count // workers threads.
+    Applied immediately if torch is loaded, otherwise when a model loads.
+    """
+    if not intra_op_threads and workers > 1:
+        intra_op_threads = max(1, (os.cpu_count() or 1) // workers)
+    if intra_op_threads:
+        # Read by OpenMP/MKL when torch is first imported.
+        os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+        os.environ["MKL_NUM_THREADS"] = str(intra_op_threads)
+
+    _threads["intra_op"] = intra_op_threads or None
+    _threads["inter_op"] = inter_op_threads or None
+    if "torch" in sys.modules:
+        apply_thread_settings()
+
+
+def apply_thread_settings():
+    import torch
+
+    if _threads["intra_op"]:
+        torch.set_num_threads(_threads["intra_op"])
+    if _threads["inter_op"] and torch.get_num_interop_threads() != _threads["inter_op"]:
+        try:
+            torch.set_num_interop_threads(_threads["inter_op"])
+        except RuntimeError:
+            # Only allowed once, before any inter-op parallel work has started.
+            print("Inter-op threads already initialized, keeping", torch.get_num_interop_threads())
+
+
+def _bf16_supported(device):
+    import torch
+
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    try:
+        return torch.ops.mkldnn._is_mkldnn_bf16_supported()
+    except (AttributeError, RuntimeError):
+        return False
+
+
+def apply_precision(model, precision="fp32", device=None):
+    """
+    Convert a loaded torch model to the requested inference precision.
+
+    fp32: unchanged
+    int8: dynamic int8 quantization of all nn.Linear layers (CPU only)
+    bf16: bfloat16 weights where the hardware supports it
+    Falls back to fp32 with a message when a mode is not available.
+    """
+    import torch
+
+    apply_thread_settings()
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision} (choose from {PRECISIONS})")
+    device = torch.device(device) if device is not None else next(model.parameters()).device
+
+    if precision == "int8":
+        if device.type != "cpu":
+            print(f"int8 dynamic quantization runs on CPU only, keeping fp32 on {device}")
+            return model
+        print("Applying dynamic int8 quantization to Linear layers")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if precision == "bf16":
+        if not _bf16_supported(device):
+            print(f"bf16 not supported on {device}, keeping fp32")
+            return model
+        print("Casting model to bf16")
+        return model.to(torch.bfloat16)
+
+    return model
+
 
 def get_device():
+    import torch
+
+    apply_thread_settings()
+
     if torch.cuda.is_available():
         print("Using NVIDIA GPU:", torch.cuda.get_device_name(0))
         return torch.device("cuda")
     else:
         print("No GPU found → using CPU")
         return torch.device("cpu")
-
@@ -1,5 +1,4 @@
 from pathlib import Path
-import yt_dlp
 import subprocess
 import json
 
@@ -26,6 +25,23 @@ def get_video_codec(video_path):
         return "unknown"
 
 
+def get_media_duration(media_path):
+    """Container duration in seconds (ffprobe)."""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "json",
+            str(media_path)
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(json.loads(result.stdout)["format"]["duration"])
+
+
 def convert_to_vscode_compatible(input_path):
 
     output_path = input_path.with_name(input_path.stem + "_vscode.mp4")
@@ -75,7 +91,55 @@ def extract_wav_audio(video_path, audio_dir):
     return wav_path
 
 
+DOWNLOADS_MANIFEST = "downloads.json"
+
+
+def _read_downloads(output_dir):
+    path = Path(output_dir) / DOWNLOADS_MANIFEST
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _record_download(url, output_dir, video_file, wav_file):
+    downloads = _read_downloads(output_dir)
+    downloads[url] = {"video": str(video_file), "wav": str(wav_file)}
+    with open(Path(output_dir) / DOWNLOADS_MANIFEST, "w", encoding="utf-8") as f:
+        json.dump(downloads, f, indent=2, ensure_ascii=False)
+
+
+def find_download(url, output_dir, audio_dir):
+    """
+    (video, wav) already downloaded for this URL, or None.
+    Looks in downloads.json first; for videos downloaded before it was
+    written, asks yt-dlp for the file name (metadata only, no download).
+    """
+    entry = _read_downloads(output_dir).get(url)
+    if entry and Path(entry["video"]).exists() and Path(entry["wav"]).exists():
+        return Path(entry["video"]), Path(entry["wav"])
+
+    try:
+        import yt_dlp
+
+        with yt_dlp.YoutubeDL({"outtmpl": str(Path(output_dir) / "%(title)s.%(ext)s"),
+                               "quiet": True, "noplaylist": True}) as ydl:
+            video_file = Path(ydl.prepare_filename(ydl.extract_info(url, download=False))).with_suffix(".mp4")
+    except Exception as e:
+        print(f"Could not look up existing download for {url}: {e}")
+        return None
+
+    for candidate in (video_file.with_name(video_file.stem + "_vscode.mp4"), video_file):
+        wav_file = Path(audio_dir) / f"{candidate.stem}.wav"
+        if candidate.exists() and wav_file.exists():
+            _record_download(url, output_dir, candidate, wav_file)
+            return candidate, wav_file
+    return None
+
+
 def download_video(url, output_dir, audio_dir):
+    import yt_dlp
+
     output_dir.mkdir(parents=True, exist_ok=True)
 
     ydl_opts = {
@@ -104,6 +168,7 @@ def download_video(url, output_dir, audio_dir):
     # extract wav audio
     wav_file = extract_wav_audio(video_file, audio_dir)
 
+    _record_download(url, output_dir, video_file, wav_file)
     print(f"Final video file: {video_file}")
     print(f"Final audio file: {wav_file}")
 